@@ -1,5 +1,10 @@
 from mojang.api import API
 from mojang.client import Client
+from mojang._scheduler import RequestScheduler, SQLiteRateLimitBackend
+from mojang._replay import ReplayAdapter
+from mojang._types import PlayerUUID
+from mojang._negative_cache import NegativeCache
+from mojang._hedging import Hedging
 
 from mojang.errors import (
     MojangError,
@@ -12,4 +17,5 @@ from mojang.errors import (
     Unauthorized,
     MissingMinecraftLicense,
     MissingMinecraftProfile,
+    DeadlineExceeded,
 )
@@ -0,0 +1,334 @@
+"""Helpers for running bulk operations concurrently"""
+import contextvars
+import itertools
+import logging
+import time
+from collections import deque
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from typing import Any, Callable, Deque, Iterable, Iterator, List, Optional, Set, TypeVar
+
+import requests
+
+from mojang._concurrency import AdaptiveLimiter
+from mojang._deadline import _deadline_scope, _remaining
+from mojang._scheduler import _LocalRateLimitBackend
+from mojang.errors import DeadlineExceeded, MojangError, TooManyRequests
+
+_log = logging.getLogger(__name__)
+
+T = TypeVar("T")
+U = TypeVar("U")
+R = TypeVar("R")
+
+# The number of times an item is retried after being ratelimited before giving up
+_MAX_RATELIMIT_RETRIES = 5
+
+
+def _call_limited(
+    func: Callable[[T], R], item: T, limiter: AdaptiveLimiter, max_sleep: float
+) -> R:
+    """Calls `func`, feeding the outcome back to the limiter. Releases the slot taken for the call."""
+    attempt = 0
+    try:
+        while True:
+            start = time.monotonic()
+            try:
+                result = func(item)
+            except TooManyRequests:
+                limiter.record(time.monotonic() - start, overloaded=True)
+                attempt += 1
+                if attempt > _MAX_RATELIMIT_RETRIES:
+                    raise
+                sleep = min(2**attempt, max_sleep)
+                remaining = _remaining()
+                if remaining is not None and remaining <= sleep:
+                    raise
+                # The slot is kept while sleeping, which eases the load further
+                time.sleep(sleep)
+                continue
+
+            limiter.record(time.monotonic() - start)
+            return result
+    finally:
+        limiter.release()
+
+
+def _time_left(end: Optional[float]) -> Optional[float]:
+    return None if end is None else max(end - time.monotonic(), 0)
+
+
+def _budget_exhausted(end: Optional[float]) -> bool:
+    return end is not None and time.monotonic() >= end
+
+
+def _skip_deadline_exceeded(limiter: AdaptiveLimiter, end: Optional[float]) -> None:
+    """Skips a call that raised `DeadlineExceeded`. Calls cut short by the time budget are expected,
+    calls that ran out of their own `deadline` are logged and counted in the `deadline_exceeded` metric."""
+    if not _budget_exhausted(end):
+        _log.warning("A call exceeded its deadline and was skipped.")
+        limiter.metrics.increment("deadline_exceeded")
+
+
+def _skip_failed(limiter: AdaptiveLimiter, exc: Exception) -> None:
+    """Skips a call that failed, e.g. with a `BadRequest` for one invalid name, so that one bad item doesn't
+    abort the whole bulk operation. Failures are logged and counted in the `failed_items` metric."""
+    _log.warning(f"A call failed and was skipped: {exc!r}")
+    limiter.metrics.increment("failed_items")
+
+
+def _map_unordered(
+    func: Callable[[T], R],
+    items: Iterable[T],
+    limiter: AdaptiveLimiter,
+    max_sleep: float = 60,
+    time_budget: Optional[float] = None,
+) -> Iterator[R]:
+    """Calls `func` on every item concurrently, with at most `limiter.limit` calls in flight.
+
+    Items are consumed lazily and results are yielded in the order the calls complete.
+    Calls that are ratelimited are retried after an exponential back-off of at most `max_sleep` seconds.
+
+    Calls that fail or exceed their own deadline are skipped, the other items are still processed. Once
+    `time_budget` seconds have passed, calls that haven't started are cancelled, calls in flight
+    are given up on and the iteration stops.
+    """
+    pending: Set[Future] = set()
+    end = None if time_budget is None else time.monotonic() + time_budget
+    executor = ThreadPoolExecutor(max_workers=limiter.max_limit)
+
+    # The calls inherit the caller's context, so that its priority applies to them,
+    # and the time budget caps the deadline of every request they make
+    with _deadline_scope(time_budget):
+        context = contextvars.copy_context()
+
+    def collect(block: bool) -> Iterator[R]:
+        nonlocal pending
+        if block:
+            done, pending = wait(pending, _time_left(end), return_when=FIRST_COMPLETED)
+        else:
+            done = {future for future in pending if future.done()}
+            pending -= done
+
+        for future in done:
+            try:
+                yield future.result()
+            except DeadlineExceeded:
+                _skip_deadline_exceeded(limiter, end)
+            except (MojangError, requests.RequestException) as exc:
+                _skip_failed(limiter, exc)
+
+        if _budget_exhausted(end):
+            raise _BudgetExhausted
+
+    try:
+        for item in items:
+            while not limiter.try_acquire():
+                if not pending:
+                    # The slots are taken by another bulk operation on the same client
+                    if not limiter.acquire(_time_left(end)):
+                        raise _BudgetExhausted
+                    break
+                yield from collect(block=True)
+
+            pending.add(
+                executor.submit(
+                    context.copy().run, _call_limited, func, item, limiter, max_sleep
+                )
+            )
+            yield from collect(block=False)
+
+        while pending:
+            yield from collect(block=True)
+    except _BudgetExhausted:
+        _log.info(
+            f"The time budget of {time_budget} seconds ran out. Cancelling {len(pending)} outstanding calls."
+        )
+    finally:
+        for future in pending:
+            # Calls that never started won't release their slot themselves
+            if future.cancel():
+                limiter.release()
+        executor.shutdown(wait=False)
+
+
+def _map_pipelined(
+    first: Callable[[T], Iterable[U]],
+    second: Callable[[U], R],
+    items: Iterable[T],
+    limiter: AdaptiveLimiter,
+    max_sleep: float = 60,
+    time_budget: Optional[float] = None,
+) -> Iterator[R]:
+    """Runs two dependent stages concurrently: `first` turns every item into any number of intermediate items,
+    and `second` turns every intermediate item into a result. Both share the slots of the limiter.
+
+    Intermediate items are handed to the second stage as soon as the call that produced them completes, and
+    second-stage calls always take precedence over starting new first-stage calls. So the first stage only
+    runs ahead while there are slots to spare, and at most the output of the first-stage calls in flight is
+    ever waiting for the second stage. Results are yielded in the order the calls complete.
+
+    Ratelimited, failed and timed out calls and the time budget are handled like in `_map_unordered`.
+    """
+    items = iter(items)
+    exhausted = False
+    backlog: Deque[U] = deque()
+    first_pending: Set[Future] = set()
+    second_pending: Set[Future] = set()
+    end = None if time_budget is None else time.monotonic() + time_budget
+    executor = ThreadPoolExecutor(max_workers=limiter.max_limit)
+
+    with _deadline_scope(time_budget):
+        context = contextvars.copy_context()
+
+    def submit(func: Callable[[Any], Any], item: Any) -> Future:
+        return executor.submit(
+            context.copy().run, _call_limited, func, item, limiter, max_sleep
+        )
+
+    try:
+        while True:
+            while backlog or not exhausted:
+                if not limiter.try_acquire():
+                    if first_pending or second_pending:
+                        break
+                    # The slots are taken by another bulk operation on the same client
+                    if not limiter.acquire(_time_left(end)):
+                        _log.info(f"The time budget of {time_budget} seconds ran out.")
+                        return
+
+                if backlog:
+                    second_pending.add(submit(second, backlog.popleft()))
+                    continue
+
+                try:
+                    item = next(items)
+                except StopIteration:
+                    exhausted = True
+                    limiter.release()
+                    break
+                first_pending.add(submit(first, item))
+
+            if not first_pending and not second_pending:
+                return
+
+            done, _ = wait(
+                first_pending | second_pending, _time_left(end), return_when=FIRST_COMPLETED
+            )
+            for future in done:
+                try:
+                    if future in first_pending:
+                        first_pending.discard(future)
+                        backlog.extend(future.result())
+                    else:
+                        second_pending.discard(future)
+                        yield future.result()
+                except DeadlineExceeded:
+                    _skip_deadline_exceeded(limiter, end)
+                except (MojangError, requests.RequestException) as exc:
+                    _skip_failed(limiter, exc)
+
+            if _budget_exhausted(end):
+                _log.info(
+                    f"The time budget of {time_budget} seconds ran out. Cancelling "
+                    f"{len(first_pending) + len(second_pending)} outstanding calls."
+                )
+                return
+    finally:
+        for future in first_pending | second_pending:
+            # Calls that never started won't release their slot themselves
+            if future.cancel():
+                limiter.release()
+        executor.shutdown(wait=False)
+
+
+class _BudgetExhausted(Exception):
+    pass
+
+
+# The client of a worker process of `_map_processes`
+_worker_client = None
+
+
+def _init_worker(client: Any, processes: int) -> None:
+    global _worker_client  # pylint: disable=global-statement
+    _worker_client = client
+
+    scheduler = client.scheduler
+    if scheduler is not None and isinstance(scheduler.backend, _LocalRateLimitBackend):
+        # Every process has its own copy of the budget, so each one gets an equal share of it
+        scheduler.rate /= processes
+        scheduler.burst = max(scheduler.burst / processes, 1)
+
+
+def _run_chunk(method: str, chunk: List[Any], kwargs: Any, end: Optional[float]) -> List[Any]:
+    if end is not None:
+        # The chunk may have waited in the queue, so its budget starts from the wall-clock end of the whole job
+        remaining = end - time.time()
+        if remaining <= 0:
+            return []
+        kwargs = {**kwargs, "time_budget": remaining}
+    return list(getattr(_worker_client, method)(chunk, **kwargs))
+
+
+def _map_processes(
+    client: Any,
+    method: str,
+    items: Iterable[T],
+    processes: int,
+    chunk_size: int,
+    time_budget: Optional[float] = None,
+    **kwargs: Any,
+) -> Iterator[R]:
+    """Splits the items into chunks, and runs the bulk iterator `method` of a copy of `client` on each chunk
+    in a pool of worker processes. Each worker still runs its chunk concurrently on its own threads.
+
+    At most two chunks per process are outstanding, so items are consumed lazily. Results are yielded
+    chunk by chunk, in the order the chunks complete. Once `time_budget` seconds have passed, chunks that
+    haven't started are cancelled, chunks in progress are given up on and the iteration stops.
+    """
+    items = iter(items)
+    chunks = iter(lambda: list(itertools.islice(items, chunk_size)), [])
+    # Wall-clock time, as the monotonic clocks of the worker processes aren't comparable with this one
+    end = None if time_budget is None else time.time() + time_budget
+    pending: Set[Future] = set()
+    executor = ProcessPoolExecutor(
+        max_workers=processes, initializer=_init_worker, initargs=(client, processes)
+    )
+
+    def collect(block: bool) -> Iterator[R]:
+        nonlocal pending
+        timeout = 0
+        if block:
+            timeout = None if end is None else max(end - time.time(), 0)
+        done, pending = wait(pending, timeout, return_when=FIRST_COMPLETED)
+        for future in done:
+            yield from future.result()
+
+        if end is not None and time.time() >= end:
+            raise _BudgetExhausted
+
+    try:
+        for chunk in chunks:
+            while len(pending) >= processes * 2:
+                yield from collect(block=True)
+
+            pending.add(executor.submit(_run_chunk, method, chunk, kwargs, end))
+            yield from collect(block=False)
+
+        while pending:
+            yield from collect(block=True)
+    except _BudgetExhausted:
+        _log.info(
+            f"The time budget of {time_budget} seconds ran out. Cancelling {len(pending)} outstanding chunks."
+        )
+    finally:
+        for future in pending:
+            future.cancel()
+        # Chunks in progress stop by themselves once the budget has run out
+        executor.shutdown(wait=end is None)
@@ -0,0 +1,187 @@
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from mojang._metrics import _Metrics
+from mojang.errors import DeadlineExceeded
+
+
+class AdaptiveLimiter:
+    """An AIMD (additive increase, multiplicative decrease) limit on the number of concurrent requests.
+
+    The limit grows by one for every window of successful, fast responses. It is cut by `backoff` as soon
+    as a request is ratelimited, or when the smoothed latency rises above `latency_tolerance` times the
+    lowest latency seen so far. After a decrease, further decreases are ignored until a full window of
+    requests has completed, so that one slow burst doesn't collapse the limit.
+
+    Args:
+        initial (optional): The starting limit.
+        min_limit (optional): The limit never drops below this.
+        max_limit (optional): The limit never grows above this.
+        backoff (optional): The factor the limit is multiplied by when backing off.
+        latency_tolerance (optional): How much slower than the baseline responses may get before backing off.
+    """
+
+    def __init__(
+        self,
+        initial: Optional[int] = 2,
+        min_limit: Optional[int] = 1,
+        max_limit: Optional[int] = 8,
+        backoff: Optional[float] = 0.5,
+        latency_tolerance: Optional[float] = 2.0,
+        metrics: Optional[_Metrics] = None,
+    ):
+        if not 1 <= min_limit <= max_limit:
+            raise ValueError("The limits must satisfy 1 <= min_limit <= max_limit.")
+
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff = backoff
+        self.latency_tolerance = latency_tolerance
+        self.metrics = metrics or _Metrics()
+
+        self._limit = float(min(max(initial, min_limit), max_limit))
+        self._in_flight = 0
+        self._latency: Optional[float] = None
+        self._baseline: Optional[float] = None
+        self._since_decrease = int(self._limit)
+        self._condition = threading.Condition()
+        self._publish()
+
+    @property
+    def limit(self) -> int:
+        """The current concurrency limit"""
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def try_acquire(self) -> bool:
+        """Takes a slot if one is available, without blocking"""
+        with self._condition:
+            if self._in_flight >= int(self._limit):
+                return False
+            self._in_flight += 1
+            self._publish()
+            return True
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """Blocks until a slot is available and takes it.
+
+        Returns:
+            `False` if no slot became available within `timeout` seconds.
+        """
+        with self._condition:
+            if not self._condition.wait_for(
+                lambda: self._in_flight < int(self._limit), timeout
+            ):
+                return False
+            self._in_flight += 1
+            self._publish()
+            return True
+
+    def release(self) -> None:
+        with self._condition:
+            self._in_flight -= 1
+            self._publish()
+            self._condition.notify()
+
+    def record(self, latency: float, overloaded: Optional[bool] = False) -> None:
+        """Feeds back the outcome of a request.
+
+        Args:
+            latency: How long the request took, in seconds.
+            overloaded (optional): Whether the request was ratelimited.
+        """
+        with self._condition:
+            self._since_decrease += 1
+
+            if overloaded:
+                self._decrease()
+                return
+
+            self._latency = latency if self._latency is None else self._latency * 0.7 + latency * 0.3
+            if self._baseline is None or self._latency < self._baseline:
+                self._baseline = self._latency
+            else:
+                # Let the baseline drift up slowly, in case the network got slower for good
+                self._baseline *= 1.001
+
+            if self._latency > self._baseline * self.latency_tolerance:
+                self._decrease()
+            else:
+                self._limit = min(self._limit + 1 / self._limit, self.max_limit)
+                self._publish()
+                self._condition.notify_all()
+
+    def _decrease(self) -> None:
+        if self._since_decrease < self._limit:
+            return
+
+        self._limit = max(self._limit * self.backoff, self.min_limit)
+        self._since_decrease = 0
+        # The latency measured at the old limit no longer applies
+        self._latency = None
+        self.metrics.increment("concurrency_decreases")
+        self._publish()
+
+    def _publish(self) -> None:
+        self.metrics.set("concurrency_limit", int(self._limit))
+        self.metrics.set("concurrency_in_flight", self._in_flight)
+
+
+class _SingleFlight:
+    """Coalesces concurrent calls with the same key into a single call.
+
+    The first caller makes the call, and callers that arrive with the same key while it is in flight wait
+    for it and share its result or exception. A call that arrives after the previous one completed is made
+    again, so results are never served stale.
+    """
+
+    def __init__(self, metrics: Optional[_Metrics] = None):
+        self.metrics = metrics or _Metrics()
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, Future] = {}
+
+    def __reduce__(self):
+        # Calls in flight belong to the threads of this process
+        return (_SingleFlight, (self.metrics,))
+
+    def _after_fork(self) -> None:
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key: Hashable, func: Callable[[], Any], timeout: Optional[float] = None) -> Any:
+        """Returns the result of `func`, or of the call with the same key that is already in flight.
+
+        Raises:
+            DeadlineExceeded: If the call in flight doesn't complete within `timeout` seconds.
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+
+        if not leader:
+            self.metrics.increment("coalesced_calls")
+            try:
+                return future.result(timeout)
+            except FutureTimeoutError:
+                raise DeadlineExceeded from None
+
+        try:
+            result = func()
+        except BaseException as exc:
+            self._finish(key)
+            future.set_exception(exc)
+            raise
+
+        self._finish(key)
+        future.set_result(result)
+        return result
+
+    def _finish(self, key: Hashable) -> None:
+        with self._lock:
+            del self._calls[key]
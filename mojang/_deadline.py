@@ -0,0 +1,65 @@
+import contextlib
+import contextvars
+import functools
+import time
+from typing import Any, Callable, Iterator, Optional, TypeVar
+
+from mojang.errors import DeadlineExceeded
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+# The time.monotonic() timestamp that the current call has to complete by
+_current_deadline: contextvars.ContextVar = contextvars.ContextVar(
+    "mojang_deadline", default=None
+)
+
+
+@contextlib.contextmanager
+def _deadline_scope(seconds: Optional[float]) -> Iterator[None]:
+    """Limits everything within the `with` block to `seconds`. An outer deadline that is sooner still applies."""
+    if seconds is None:
+        yield
+        return
+
+    deadline = time.monotonic() + seconds
+    outer = _current_deadline.get()
+    if outer is not None:
+        deadline = min(deadline, outer)
+
+    token = _current_deadline.set(deadline)
+    try:
+        yield
+    finally:
+        _current_deadline.reset(token)
+
+
+def _remaining() -> Optional[float]:
+    """Returns the seconds left until the current deadline, or `None` if there is no deadline.
+
+    Raises:
+        DeadlineExceeded: If the deadline has already passed.
+    """
+    deadline = _current_deadline.get()
+    if deadline is None:
+        return None
+
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        raise DeadlineExceeded
+    return remaining
+
+
+def _deadline_passed() -> bool:
+    deadline = _current_deadline.get()
+    return deadline is not None and time.monotonic() >= deadline
+
+
+def _with_deadline(func: F) -> F:
+    """Applies the keyword-only `deadline` argument of a method to every request it makes"""
+
+    @functools.wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        with _deadline_scope(kwargs.get("deadline")):
+            return func(*args, **kwargs)
+
+    return wrapper
@@ -0,0 +1,178 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Callable, Deque, Dict, Optional
+
+import requests
+
+from mojang._metrics import _Metrics
+
+# The number of recent response times per host the threshold is computed from
+_WINDOW = 200
+# The threshold is recomputed after this many new response times
+_RECOMPUTE_EVERY = 16
+# The maximum number of hedges that can be saved up while none are needed
+_MAX_CREDIT = 5.0
+
+
+class Hedging:
+    """Sends a second copy of a slow GET request and uses whichever response arrives first.
+
+    A request is hedged once it has taken longer than the `percentile` of the recent response times of its
+    host, so that the slowest responses no longer dominate the tail latency. Hedges are capped at
+    `max_ratio` of all requests. With a `RequestScheduler`, a hedge is only sent if the rate limit budget
+    has a token to spare right away, outside the share reserved for interactive requests, so hedging never
+    causes ratelimiting.
+
+    Args:
+        percentile (optional): The percentile (0 - 100) of recent response times after which a request is hedged.
+        max_ratio (optional): The maximum number of hedges per request.
+        min_samples (optional): The number of responses from a host needed before its requests are hedged.
+        min_delay (optional): The minimum number of seconds to wait before hedging.
+        max_workers (optional): The number of threads hedged requests are sent from.
+    """
+
+    def __init__(
+        self,
+        percentile: Optional[float] = 95,
+        max_ratio: Optional[float] = 0.05,
+        min_samples: Optional[int] = 20,
+        min_delay: Optional[float] = 0.05,
+        max_workers: Optional[int] = 32,
+    ):
+        if not 0 < percentile < 100:
+            raise ValueError("The percentile must be between 0 and 100.")
+        if not 0 <= max_ratio <= 1:
+            raise ValueError("The max ratio must be between 0.0 and 1.0.")
+
+        self.percentile = percentile
+        self.max_ratio = max_ratio
+        self.min_samples = max(min_samples, 1)
+        self.min_delay = min_delay
+        self.max_workers = max_workers
+
+        self._lock = threading.Lock()
+        self._samples: Dict[str, Deque[float]] = {}
+        self._thresholds: Dict[str, float] = {}
+        self._new_samples: Dict[str, int] = {}
+        self._credit = 0.0
+        self._pool: Optional[ThreadPoolExecutor] = None
+
+    def __reduce__(self):
+        # Copies start without the response times of this process
+        return (
+            Hedging,
+            (self.percentile, self.max_ratio, self.min_samples, self.min_delay, self.max_workers),
+        )
+
+    def _after_fork(self) -> None:
+        # The threads of the pool don't exist in the child process
+        self._lock = threading.Lock()
+        self._pool = None
+
+    def delay(self, key: str) -> Optional[float]:
+        """Returns the number of seconds after which a request to `key` is hedged, or `None` if it isn't"""
+        with self._lock:
+            threshold = self._thresholds.get(key)
+        if threshold is None:
+            return None
+        return max(threshold, self.min_delay)
+
+    def record(self, key: str, seconds: float) -> None:
+        """Adds the response time of a request that wasn't a hedge"""
+        with self._lock:
+            samples = self._samples.setdefault(key, deque(maxlen=_WINDOW))
+            samples.append(seconds)
+            count = self._new_samples.get(key, 0) + 1
+
+            if len(samples) >= self.min_samples and (
+                key not in self._thresholds or count >= _RECOMPUTE_EVERY
+            ):
+                ordered = sorted(samples)
+                index = min(int(len(ordered) * self.percentile / 100), len(ordered) - 1)
+                self._thresholds[key] = ordered[index]
+                count = 0
+            self._new_samples[key] = count
+
+    def _earn(self) -> None:
+        with self._lock:
+            self._credit = min(self._credit + self.max_ratio, _MAX_CREDIT)
+
+    def _spend(self) -> bool:
+        with self._lock:
+            if self._credit < 1:
+                return False
+            self._credit -= 1
+            return True
+
+    def _executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="mojang-hedge"
+                )
+            return self._pool
+
+    def send(
+        self,
+        send: Callable[[], requests.Response],
+        key: str,
+        may_hedge: Callable[[], bool],
+        metrics: _Metrics,
+    ) -> requests.Response:
+        """Makes a request with `send`, and hedges it with a second call if it is slow and `may_hedge` allows it"""
+        self._earn()
+        delay = self.delay(key)
+
+        if delay is None:
+            start = time.monotonic()
+            resp = send()
+            self.record(key, time.monotonic() - start)
+            return resp
+
+        executor = self._executor()
+        start = time.monotonic()
+
+        def record(future: Future) -> None:
+            # Late responses count as well, otherwise the threshold would only ever drop
+            if future.exception() is None:
+                self.record(key, time.monotonic() - start)
+
+        primary = executor.submit(send)
+        primary.add_done_callback(record)
+
+        done, _ = wait([primary], timeout=delay)
+        if done or not self._spend():
+            return primary.result()
+
+        if not may_hedge():
+            # Give the unused hedge back
+            with self._lock:
+                self._credit += 1
+            return primary.result()
+
+        metrics.increment("hedges_sent")
+        hedge = executor.submit(send)
+        pending = {primary, hedge}
+
+        winner = None
+        while winner is None:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            succeeded = [future for future in done if future.exception() is None]
+            if succeeded:
+                winner = succeeded[0]
+            elif not pending:
+                # Both failed, raise the error of the original request
+                winner = primary
+
+        for future in pending:
+            future.add_done_callback(_close_response)
+        if winner is hedge:
+            metrics.increment("hedges_won")
+        return winner.result()
+
+
+def _close_response(future: Future) -> None:
+    if future.exception() is None:
+        future.result().close()
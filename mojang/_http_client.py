@@ -1,12 +1,25 @@
+import contextlib
+import json
+import os
+import random
 import time
-from typing import Any, List, Optional
+import weakref
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
+from urllib.parse import urlsplit
 import logging
 
 import requests
-
-from http.client import HTTPConnection
+from requests.adapters import HTTPAdapter
 
 
+from mojang._concurrency import AdaptiveLimiter, _SingleFlight
+from mojang._deadline import _deadline_passed, _remaining
+from mojang._hedging import Hedging
+from mojang._metrics import _Metrics
+from mojang._negative_cache import NegativeCache
+from mojang._replay import ReplayAdapter, _Recorder, _RecordingAdapter
+from mojang._scheduler import RequestScheduler, _current_priority, _PRIORITIES
+from mojang._types import Span
 from mojang.errors import (
     MojangError,
     BadRequest,
@@ -15,10 +28,46 @@ from mojang.errors import (
     TooManyRequests,
     ServerError,
     Unauthorized,
+    DeadlineExceeded,
 )
+from mojang._utils import _decode_json, _redact_headers
 
 _log = logging.getLogger(__name__)
 
+# Every client, so that they can be made safe to use in a forked child process
+_clients: "weakref.WeakSet[_HTTPClient]" = weakref.WeakSet()
+
+
+def _reset_clients_after_fork() -> None:
+    for client in list(_clients):
+        client._after_fork()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_clients_after_fork)
+
+
+def _log_span(span: Span) -> None:
+    phases = " ".join(
+        f"{phase}={duration * 1000:.1f}ms" for phase, duration in span.phases.items()
+    )
+    _log.debug(
+        f"[trace {span.trace_id}] {span.name} {span.method.upper()} {span.url} "
+        f"status={span.status_code} duration={span.duration * 1000:.1f}ms {phases}",
+        extra={"span": span},
+    )
+
+
+def _clamp_timeout(
+    timeout: Optional[Union[float, Tuple[float, float]]], remaining: float
+) -> Union[float, Tuple[float, float]]:
+    """Shortens a requests timeout so that it ends before the deadline"""
+    if timeout is None:
+        return remaining
+    if isinstance(timeout, tuple):
+        return tuple(min(part, remaining) for part in timeout)
+    return min(timeout, remaining)
+
 
 class _HTTPClient:
     def __init__(
@@ -27,29 +76,139 @@ class _HTTPClient:
         retry_on_ratelimit: Optional[bool] = False,
         ratelimit_sleep_time: Optional[int] = 60,
         debug_mode: Optional[bool] = False,
+        json_loads: Optional[Callable[[bytes], Any]] = None,
+        trace_sample_rate: Optional[float] = 0.0,
+        trace_handler: Optional[Callable[[Span], None]] = None,
+        scheduler: Optional[RequestScheduler] = None,
+        record_to: Optional[str] = None,
+        replay_from: Optional[str] = None,
+        replay_realtime: Optional[bool] = False,
+        max_concurrency: Optional[int] = 8,
+        negative_cache: Optional[NegativeCache] = None,
+        timeout: Optional[Union[float, Tuple[float, float]]] = (10, 30),
+        hedging: Optional[Hedging] = None,
     ):
+        """
+        Args:
+            session (optional): The `requests.Session` used to make requests.
+            retry_on_ratelimit (optional): Sleep and retry the request when we are being ratelimited.
+            ratelimit_sleep_time (optional): The number of seconds to sleep for when we are being ratelimited.
+            debug_mode (optional): Trace every request and log it through the `mojang` logger at `DEBUG` level.
+            json_loads (optional): The function used to decode JSON response bodies. It receives the raw
+                body as `bytes`, which allows a faster JSON library to be plugged in (e.g. `orjson.loads`).
+                Defaults to `json.loads`.
+            trace_sample_rate (optional): The fraction of requests (0.0 - 1.0) that are traced.
+            trace_handler (optional): Called with every finished `Span`. By default, spans are logged
+                at `DEBUG` level.
+            scheduler (optional): A `RequestScheduler` that paces requests and lets interactive requests
+                pre-empt bulk requests. Requests are sent right away if this isn't set.
+            record_to (optional): Record every request and response to this file, with authorization redacted.
+            replay_from (optional): Serve responses from a recording made with `record_to` instead of the network.
+            replay_realtime (optional): Reproduce the original latency of each replayed response.
+            max_concurrency (optional): The maximum number of concurrent requests made by bulk operations.
+                The actual number adapts to ratelimiting and response times, and can be read from `metrics`.
+            negative_cache (optional): A `NegativeCache` that remembers usernames that do not exist,
+                so that repeated lookups of them return right away without a request.
+            timeout (optional): The connect and read timeouts of each request in seconds, either as a
+                `(connect, read)` tuple or a single number for both. `None` waits forever.
+            hedging (optional): A `Hedging` policy, which re-sends GET requests that are unusually slow and
+                uses whichever response arrives first. Use it together with a `scheduler`, so that hedges
+                only use spare rate limit budget.
+        """
         self.ratelimit_sleep_time = ratelimit_sleep_time
         self.retry_on_ratelimit = retry_on_ratelimit
+        self.json_loads = json_loads or json.loads
+        self.trace_sample_rate = trace_sample_rate
+        self.trace_handler = trace_handler or _log_span
+        self.scheduler = scheduler
+        self.metrics = _Metrics()
+        self.concurrency = AdaptiveLimiter(max_limit=max_concurrency, metrics=self.metrics)
+        self._single_flight = _SingleFlight(self.metrics)
+        self.negative_cache = negative_cache
+        self.timeout = timeout
+        self.hedging = hedging
 
-        if session:
-            self.session = session
-        else:
-            self.session = requests.Session()
+        self.replay_from = replay_from
+        self.replay_realtime = replay_realtime
+        self._owns_session = not session
+        self.session = session or self._create_session()
+        if session and replay_from:
+            # A supplied session replays as well, instead of silently going to the network
+            self._mount_replay(session)
 
-            self.session.headers.update(
-                {
-                    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
-                    "(KHTML, like Gecko) Chrome/105.0.0.0 Safari/537.36"
-                }
-            )
+        if record_to:
+            recorder = _Recorder(record_to)
+            for prefix, adapter in list(self.session.adapters.items()):
+                self.session.mount(prefix, _RecordingAdapter(adapter, recorder))
 
         if debug_mode:
-            HTTPConnection.debuglevel = 1
-            logging.basicConfig()
-            logging.getLogger().setLevel(logging.DEBUG)
-            requests_log = logging.getLogger("requests.packages.urllib3")
-            requests_log.setLevel(logging.DEBUG)
-            requests_log.propagate = True
+            self.trace_sample_rate = 1.0
+
+            library_log = logging.getLogger("mojang")
+            library_log.setLevel(logging.DEBUG)
+            if not library_log.handlers:
+                library_log.addHandler(logging.StreamHandler())
+
+        _clients.add(self)
+
+    def _create_session(self) -> requests.Session:
+        session = requests.Session()
+
+        session.headers.update(
+            {
+                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+                "(KHTML, like Gecko) Chrome/105.0.0.0 Safari/537.36"
+            }
+        )
+
+        if self.replay_from:
+            self._mount_replay(session)
+        return session
+
+    def _mount_replay(self, session: requests.Session) -> None:
+        adapter = ReplayAdapter(self.replay_from, realtime=self.replay_realtime)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        """Clients are pickled from their configuration. The default session, with its connection pools,
+        and the concurrency limiter are created anew when unpickling, and recording is not carried over."""
+        state = self.__dict__.copy()
+        state["concurrency"] = self.concurrency.max_limit
+        if self._owns_session:
+            del state["session"]
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self.concurrency = AdaptiveLimiter(max_limit=state["concurrency"], metrics=self.metrics)
+        if self._owns_session:
+            self.session = self._create_session()
+        _clients.add(self)
+
+    def _after_fork(self) -> None:
+        """Resets everything that must not be shared with the parent process: connection pools, locks held by
+        threads that don't exist in the child, and the recording file, which only the parent writes to."""
+        for prefix, adapter in list(self.session.adapters.items()):
+            if isinstance(adapter, _RecordingAdapter):
+                adapter = adapter.adapter
+                self.session.mount(prefix, adapter)
+            if isinstance(adapter, ReplayAdapter):
+                adapter._after_fork()
+            if isinstance(adapter, HTTPAdapter):
+                # Drop the parent's pools without closing them, which would affect the parent's connections
+                adapter.init_poolmanager(
+                    adapter._pool_connections, adapter._pool_maxsize, block=adapter._pool_block
+                )
+                adapter.proxy_manager = {}
+
+        self.metrics._after_fork()
+        self.concurrency = AdaptiveLimiter(
+            max_limit=self.concurrency.max_limit, metrics=self.metrics
+        )
+        for component in (self._single_flight, self.scheduler, self.negative_cache, self.hedging):
+            if component is not None:
+                component._after_fork()
 
     def request(
         self,
@@ -60,10 +219,107 @@ class _HTTPClient:
     ) -> Any:
         """Internal request handler"""
 
-        resp = self.session.request(method, url, **kwargs)
+        # Tracing is skipped entirely unless this request is sampled
+        span = None
+        if self.trace_sample_rate and random.random() < self.trace_sample_rate:
+            span = Span(
+                trace_id=os.urandom(8).hex(),
+                span_id=os.urandom(8).hex(),
+                name="request",
+                method=method,
+                url=url,
+                start=time.time(),
+            )
+
+        return self._traced(span, method, url, ignore_codes, **kwargs)
+
+    def _traced(
+        self,
+        span: Optional[Span],
+        method: str,
+        url: str,
+        ignore_codes: Optional[List[int]] = None,
+        **kwargs: Any,
+    ) -> Any:
+        """Sends a request, and finishes and reports its span if it is traced"""
+        try:
+            return self._send(span, method, url, ignore_codes, **kwargs)
+        except Exception as exc:
+            if span is not None:
+                span.error = exc.__class__.__name__
+            raise
+        finally:
+            if span is not None:
+                span.duration = time.time() - span.start
+                self.trace_handler(span)
+
+    @contextlib.contextmanager
+    def priority(self, priority: str) -> Iterator[None]:
+        """Sets the priority class of the requests made within the `with` block.
+
+        Args:
+            priority: `"interactive"` (the default for all requests) or `"bulk"`.
+        """
+        if priority not in _PRIORITIES:
+            raise ValueError(f"Priority must be one of {', '.join(_PRIORITIES)}.")
+
+        token = _current_priority.set(priority)
+        try:
+            yield
+        finally:
+            _current_priority.reset(token)
+
+    def _bulk(self, func: Callable[..., Any], **extra: Any) -> Callable[..., Any]:
+        """Wraps a method so that it is called with the `"bulk"` priority and the extra keyword arguments"""
+
+        def call(*args: Any, **kwargs: Any) -> Any:
+            with self.priority("bulk"):
+                return func(*args, **kwargs, **extra)
+
+        return call
+
+    def _send(
+        self,
+        span: Optional[Span],
+        method: str,
+        url: str,
+        ignore_codes: Optional[List[int]] = None,
+        **kwargs: Any,
+    ) -> Any:
+        remaining = _remaining()
+
+        if self.scheduler is not None:
+            waited = self.scheduler.acquire(urlsplit(url).netloc, timeout=remaining)
+            if span is not None:
+                span.phases["queue"] = waited
+            remaining = _remaining()
+
+        kwargs.setdefault("timeout", self.timeout)
+        send_kwargs = kwargs
+        if remaining is not None:
+            send_kwargs = {**kwargs, "timeout": _clamp_timeout(kwargs["timeout"], remaining)}
 
         _log.debug(f"Making API request: {method} {url}\n")
 
+        start = time.perf_counter()
+        try:
+            if self.hedging is not None and method.lower() == "get":
+                resp = self._hedged_request(method, url, **send_kwargs)
+            else:
+                resp = self.session.request(method, url, **send_kwargs)
+        except requests.Timeout as exc:
+            if _deadline_passed():
+                raise DeadlineExceeded from exc
+            raise
+
+        if span is not None:
+            ttfb = resp.elapsed.total_seconds()
+            span.phases["ttfb"] = ttfb
+            span.phases["transfer"] = max(time.perf_counter() - start - ttfb, 0.0)
+            span.status_code = resp.status_code
+            span.headers = _redact_headers(resp.request.headers)
+            resp._mojang_span = span
+
         if resp.ok:
             return resp
 
@@ -84,12 +340,32 @@ class _HTTPClient:
             raise NotFound
 
         if resp.status_code == 429:
-            if self.retry_on_ratelimit:
+            if self.scheduler is not None:
+                # Make every client sharing the scheduler's budget back off, not just this one
+                self.scheduler.backoff(urlsplit(url).netloc, self.ratelimit_sleep_time)
+
+            remaining = _remaining()
+            if self.retry_on_ratelimit and (
+                remaining is None or remaining > self.ratelimit_sleep_time
+            ):
                 _log.warning(
                     f"We are being ratelimited. Sleeping for {self.ratelimit_sleep_time} seconds."
                 )
                 time.sleep(self.ratelimit_sleep_time)
-                return self.request(method, url, ignore_codes, **kwargs)
+                # The retry belongs to the same trace, and is only traced if the original request is
+                retry = None
+                if span is not None:
+                    span.phases["ratelimit_wait"] = self.ratelimit_sleep_time
+                    retry = Span(
+                        trace_id=span.trace_id,
+                        span_id=os.urandom(8).hex(),
+                        parent_id=span.span_id,
+                        name="retry",
+                        method=method,
+                        url=url,
+                        start=time.time(),
+                    )
+                return self._traced(retry, method, url, ignore_codes, **kwargs)
             else:
                 raise TooManyRequests
 
@@ -97,3 +373,51 @@ class _HTTPClient:
             raise ServerError
 
         raise MojangError(response=resp)
+
+    def _hedged_request(self, method: str, url: str, **kwargs: Any) -> requests.Response:
+        host = urlsplit(url).netloc
+
+        def may_hedge() -> bool:
+            # Hedges have to fit in the rate limit budget without waiting
+            return self.scheduler is None or self.scheduler.try_acquire(host)
+
+        return self.hedging.send(
+            lambda: self.session.request(method, url, **kwargs),
+            host,
+            may_hedge,
+            self.metrics,
+        )
+
+    def _json(self, resp: requests.Response) -> Any:
+        """Decodes the JSON body of a response with the configured codec.
+
+        Raises:
+            ValueError: If the body is not valid JSON.
+        """
+        if (
+            not self.trace_sample_rate
+            or not hasattr(resp, "_mojang_span")
+            or hasattr(resp, "_mojang_json")
+        ):
+            return _decode_json(resp, self.json_loads)
+
+        parent = resp._mojang_span
+        span = Span(
+            trace_id=parent.trace_id,
+            span_id=os.urandom(8).hex(),
+            parent_id=parent.span_id,
+            name="parse",
+            method=parent.method,
+            url=parent.url,
+            status_code=parent.status_code,
+            start=time.time(),
+        )
+        start = time.perf_counter()
+        try:
+            return _decode_json(resp, self.json_loads)
+        except ValueError as exc:
+            span.error = exc.__class__.__name__
+            raise
+        finally:
+            span.duration = span.phases["parse"] = time.perf_counter() - start
+            self.trace_handler(span)
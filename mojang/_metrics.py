@@ -0,0 +1,60 @@
+import bisect
+import threading
+from typing import Any, Dict, List, Optional
+
+from mojang._types import Histogram
+
+# The upper bounds of the histogram buckets in seconds, from 5ms to 10s
+_HISTOGRAM_BOUNDS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0]
+
+
+class _Metrics:
+    """Thread-safe gauges, counters and latency histograms of an HTTP client"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._values: Dict[str, float] = {}
+        self._histograms: Dict[str, List[Any]] = {}
+
+    def set(self, name: str, value: float) -> None:
+        with self._lock:
+            self._values[name] = value
+
+    def increment(self, name: str, amount: float = 1) -> None:
+        with self._lock:
+            self._values[name] = self._values.get(name, 0) + amount
+
+    def observe(self, name: str, seconds: float) -> None:
+        """Adds a latency to a histogram"""
+        bucket = bisect.bisect_left(_HISTOGRAM_BOUNDS, seconds)
+        with self._lock:
+            counts, total = self._histograms.get(name) or ([0] * (len(_HISTOGRAM_BOUNDS) + 1), 0.0)
+            counts[bucket] += 1
+            self._histograms[name] = [counts, total + seconds]
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            return dict(self._values)
+
+    def histogram(self, name: str) -> Optional[Histogram]:
+        """Returns a copy of a latency histogram, or `None` if nothing was observed yet"""
+        with self._lock:
+            if name not in self._histograms:
+                return None
+            counts, total = self._histograms[name]
+            return Histogram(list(_HISTOGRAM_BOUNDS), list(counts), sum(counts), total)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "values": dict(self._values),
+                "histograms": {name: [list(counts), total] for name, (counts, total) in self._histograms.items()},
+            }
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self._lock = threading.Lock()
+        self._values = state["values"]
+        self._histograms = state["histograms"]
+
+    def _after_fork(self) -> None:
+        self._lock = threading.Lock()
@@ -0,0 +1,110 @@
+import hashlib
+import math
+import threading
+import time
+from typing import Any, Dict, Optional
+
+
+class _BloomFilter:
+    def __init__(self, capacity: int, false_positive_rate: float):
+        self.size = max(
+            int(-capacity * math.log(false_positive_rate) / math.log(2) ** 2), 8
+        )
+        self.hash_count = max(round(self.size / capacity * math.log(2)), 1)
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hash_count))
+
+    def add(self, key: str) -> None:
+        for position in self._positions(key):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        return all(
+            self._bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(key)
+        )
+
+
+class NegativeCache:
+    """A compact, time-windowed cache of usernames that do not exist.
+
+    Names are stored in a pair of Bloom filters, each taking roughly 1.4 bytes per name of `capacity`
+    at a 1% false positive rate. Every `window` seconds (or once `capacity` names were added) the older filter is
+    dropped, so a name is forgotten between one and two windows after it was added and names that are
+    registered later do not stay hidden forever.
+
+    Args:
+        capacity (optional): The number of names a single window is sized for.
+        false_positive_rate (optional): The chance that a lookup of a name that exists is wrongly
+            reported as missing.
+        window (optional): The number of seconds after which the filters rotate.
+    """
+
+    def __init__(
+        self,
+        capacity: Optional[int] = 1_000_000,
+        false_positive_rate: Optional[float] = 0.01,
+        window: Optional[float] = 3600,
+    ):
+        if not 0 < false_positive_rate < 1:
+            raise ValueError("The false positive rate must be between 0 and 1.")
+
+        self.capacity = capacity
+        self.false_positive_rate = false_positive_rate
+        self.window = window
+        self._lock = threading.Lock()
+        self._current = self._new_filter()
+        self._previous = self._new_filter()
+        self._rotated_at = time.monotonic()
+
+    def _new_filter(self) -> _BloomFilter:
+        # Both filters are checked, so each one gets half of the false positive budget
+        return _BloomFilter(self.capacity, self.false_positive_rate / 2)
+
+    def _rotate_if_needed(self) -> None:
+        elapsed = time.monotonic() - self._rotated_at
+        if elapsed >= 2 * self.window:
+            # Idle for more than one window, so everything in the current filter has expired as well
+            self._previous = self._new_filter()
+            self._current = self._new_filter()
+            self._rotated_at = time.monotonic()
+        elif elapsed >= self.window or self._current.count >= self.capacity:
+            self._previous = self._current
+            self._current = self._new_filter()
+            self._rotated_at = time.monotonic()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        with self._lock:
+            state = self.__dict__.copy()
+        del state["_lock"]
+        # Monotonic clocks of different processes can't be compared, so the age of the window is stored
+        state["_rotated_at"] = time.monotonic() - self._rotated_at
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+        self._rotated_at = time.monotonic() - state["_rotated_at"]
+
+    def _after_fork(self) -> None:
+        self._lock = threading.Lock()
+
+    def add(self, username: str) -> None:
+        """Remembers that a username does not exist"""
+        username = username.lower()
+        with self._lock:
+            self._rotate_if_needed()
+            self._current.add(username)
+
+    def __contains__(self, username: str) -> bool:
+        username = username.lower()
+        with self._lock:
+            self._rotate_if_needed()
+            return username in self._current or username in self._previous
@@ -0,0 +1,240 @@
+"""Recording of live traffic and offline replay of it.
+
+Recordings are gzip-compressed JSON lines. The first line is a header, every following line is one
+request/response pair. Credentials are redacted before anything is written: authorization and cookie
+headers, and passwords and tokens in URLs and bodies.
+"""
+import base64
+import gzip
+import json
+import re
+import threading
+import time
+import weakref
+from collections import deque
+from datetime import timedelta
+from typing import Any, Deque, Dict, Iterator, Optional, Tuple
+
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from mojang._utils import _redact_headers
+
+_FORMAT_VERSION = 1
+
+# Form fields, query parameters and JSON keys that hold credentials during the login flows
+_REDACTED_FIELDS = (
+    "passwd",
+    "PPFT",
+    "RpsTicket",
+    "UserTokens",
+    "identityToken",
+    "Token",
+    "accessToken",
+    "access_token",
+    "clientToken",
+    "client_token",
+    "refresh_token",
+)
+_FIELDS = "|".join(_REDACTED_FIELDS)
+# A JSON string or array value, e.g. `"accessToken": "..."` or `"UserTokens": ["..."]`
+_JSON_FIELD = re.compile(rf'"({_FIELDS})"(\s*:\s*)(?:"(?:[^"\\]|\\.)*"|\[[^\]]*\])')
+# A form field or URL parameter, e.g. `passwd=...` or `#access_token=...`
+_FORM_FIELD = re.compile(rf"(^|[?&#])({_FIELDS})=[^&#\s]*")
+
+
+def _encode_body(body: Any) -> Tuple[Optional[str], bool]:
+    """Returns the body as text, or as base64 if it isn't valid UTF-8, and whether it was base64 encoded"""
+    if body is None:
+        return None, False
+    if isinstance(body, str):
+        return body, False
+    try:
+        return body.decode(), False
+    except UnicodeDecodeError:
+        return base64.b64encode(body).decode(), True
+
+
+def _decode_body(body: Optional[str], is_base64: bool) -> bytes:
+    if body is None:
+        return b""
+    if is_base64:
+        return base64.b64decode(body)
+    return body.encode()
+
+
+def _redact(text: Optional[str]) -> Optional[str]:
+    """Replaces the values of credential fields in a URL, or in a form-encoded or JSON body"""
+    if not text:
+        return text
+    text = _JSON_FIELD.sub(r'"\1"\2"<redacted>"', text)
+    return _FORM_FIELD.sub(r"\1\2=<redacted>", text)
+
+
+def _redact_body(body: Any) -> Tuple[Optional[str], bool]:
+    """Encodes a body like `_encode_body`, with credentials redacted from text bodies"""
+    text, is_base64 = _encode_body(body)
+    return (text, True) if is_base64 else (_redact(text), False)
+
+
+def _request_key(method: str, url: str, body: Any) -> Tuple[str, str, Optional[str]]:
+    # Recordings only hold the redacted URL and body, so requests are matched on those
+    return method.upper(), _redact(url), _redact_body(body)[0]
+
+
+def _read_records(path: str) -> Iterator[Dict[str, Any]]:
+    """Yields the header and then every record of a recording"""
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        try:
+            for line in f:
+                yield json.loads(line)
+        except EOFError:
+            # The recording process hasn't closed the file (yet), the flushed records are still complete
+            pass
+
+
+class _Recorder:
+    """Appends request/response pairs to a recording file"""
+
+    def __init__(self, path: str):
+        self._file = gzip.open(path, "wt", encoding="utf-8")
+        self._lock = threading.Lock()
+        self._start = time.monotonic()
+        self._write({"version": _FORMAT_VERSION, "created_at": time.time()})
+        weakref.finalize(self, self._file.close)
+
+    def _write(self, record: Dict[str, Any]) -> None:
+        with self._lock:
+            self._file.write(json.dumps(record, separators=(",", ":")) + "\n")
+            # Flush so that the recording stays readable even if the process is killed
+            self._file.flush()
+
+    def record(
+        self, request: requests.PreparedRequest, resp: requests.Response, elapsed: float
+    ) -> None:
+        body, body_b64 = _redact_body(request.body)
+        content, content_b64 = _redact_body(resp.content)
+        response_headers = {
+            name: _redact(value) for name, value in _redact_headers(resp.headers).items()
+        }
+
+        self._write(
+            {
+                "t": round(time.monotonic() - self._start - elapsed, 6),
+                "method": request.method,
+                "url": _redact(request.url),
+                "headers": _redact_headers(request.headers),
+                "body": body,
+                "body_b64": body_b64,
+                "status": resp.status_code,
+                "reason": resp.reason,
+                "final_url": _redact(resp.url),
+                "response_headers": response_headers,
+                "content": content,
+                "content_b64": content_b64,
+                "elapsed": round(elapsed, 6),
+            }
+        )
+
+
+class _RecordingAdapter(BaseAdapter):
+    """Wraps a transport adapter and records everything sent through it"""
+
+    def __init__(self, adapter: BaseAdapter, recorder: _Recorder):
+        super().__init__()
+        self.adapter = adapter
+        self.recorder = recorder
+
+    def send(self, request, **kwargs):
+        start = time.monotonic()
+        resp = self.adapter.send(request, **kwargs)
+        # Reading the content here means streamed responses are recorded in full as well
+        resp.content  # pylint: disable=pointless-statement
+        self.recorder.record(request, resp, time.monotonic() - start)
+        return resp
+
+    def close(self):
+        self.adapter.close()
+
+    def __reduce__(self):
+        # Copies in other processes don't record, as they would corrupt the recording
+        return _unwrap, (self.adapter,)
+
+
+def _unwrap(adapter: BaseAdapter) -> BaseAdapter:
+    return adapter
+
+
+class ReplayAdapter(BaseAdapter):
+    """A transport adapter that serves responses from a recording instead of the network.
+
+    Requests are matched on their method, URL and body. Identical requests are answered in the order they
+    were recorded, and the last matching response is repeated once they run out.
+
+    Args:
+        path: The recording file to replay.
+        realtime (optional): Reproduce the original timing: a response is never served before the time its
+            request was originally made, relative to the first request, plus its original latency. Otherwise,
+            responses are served as fast as possible.
+    """
+
+    def __init__(self, path: str, realtime: Optional[bool] = False):
+        super().__init__()
+        self.path = path
+        self.realtime = realtime
+        self._lock = threading.Lock()
+        # The time.monotonic() timestamp that the offsets of the recording are relative to
+        self._start: Optional[float] = None
+        self._records: Dict[Tuple[str, str, Optional[str]], Deque[Dict[str, Any]]] = {}
+
+        records = _read_records(path)
+        header = next(records, {})
+        if header.get("version") != _FORMAT_VERSION:
+            raise ValueError(f"Unsupported recording version: {header.get('version')}")
+
+        for record in records:
+            key = (record["method"].upper(), record["url"], record["body"])
+            self._records.setdefault(key, deque()).append(record)
+
+    def __reduce__(self):
+        # Copies replay the recording from the start
+        return ReplayAdapter, (self.path, self.realtime)
+
+    def _after_fork(self) -> None:
+        # The lock may have been held by a thread that doesn't exist in the child
+        self._lock = threading.Lock()
+
+    def send(self, request, **kwargs):
+        key = _request_key(request.method, request.url, request.body)
+
+        with self._lock:
+            records = self._records.get(key)
+            if not records:
+                raise requests.ConnectionError(
+                    f"No recorded response for {request.method} {request.url}", request=request
+                )
+            record = records.popleft() if len(records) > 1 else records[0]
+            if self._start is None:
+                self._start = time.monotonic() - record["t"]
+
+        if self.realtime:
+            # Requests that are sent sooner than they originally were wait for their original time
+            sent = max(time.monotonic(), self._start + record["t"])
+            time.sleep(max(sent + record["elapsed"] - time.monotonic(), 0))
+
+        resp = requests.Response()
+        resp.status_code = record["status"]
+        resp.reason = record["reason"]
+        resp.url = record["final_url"]
+        resp.headers = CaseInsensitiveDict(record["response_headers"])
+        resp.encoding = get_encoding_from_headers(resp.headers)
+        resp.request = request
+        resp.elapsed = timedelta(seconds=record["elapsed"])
+        resp._content = _decode_body(record["content"], record["content_b64"])
+        resp._content_consumed = True
+        return resp
+
+    def close(self):
+        pass
@@ -0,0 +1,306 @@
+import contextlib
+import contextvars
+import itertools
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Iterator, Optional, Tuple
+
+from mojang.errors import DeadlineExceeded
+
+INTERACTIVE = "interactive"
+BULK = "bulk"
+
+_PRIORITIES = (INTERACTIVE, BULK)
+
+# The priority class of requests made from the current thread / context
+_current_priority: contextvars.ContextVar = contextvars.ContextVar(
+    "mojang_priority", default=INTERACTIVE
+)
+
+
+class _LocalRateLimitBackend:
+    """Token buckets that live in the current process, one per key"""
+
+    def __init__(self):
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+        self._blocked: Dict[str, float] = {}
+
+    def try_take(self, key: str, rate: float, burst: float, reserve: float) -> float:
+        """Takes a token from the bucket if more than `reserve` tokens would be left over.
+
+        Returns:
+            `0` if a token was taken. Otherwise, the number of seconds until one could be taken.
+        """
+        now = time.monotonic()
+        blocked = self._blocked.get(key, 0.0) - now
+        if blocked > 0:
+            return blocked
+
+        tokens, updated = self._buckets.get(key, (burst, now))
+        tokens = min(burst, tokens + (now - updated) * rate)
+
+        if tokens >= reserve + 1:
+            self._buckets[key] = (tokens - 1, now)
+            return 0.0
+
+        self._buckets[key] = (tokens, now)
+        return (reserve + 1 - tokens) / rate
+
+    def block(self, key: str, seconds: float) -> None:
+        """Stops any tokens from being taken from the bucket for `seconds`"""
+        until = time.monotonic() + seconds
+        self._blocked[key] = max(self._blocked.get(key, 0.0), until)
+
+
+class SQLiteRateLimitBackend:
+    """Token buckets stored in a SQLite database, shared by every process that uses the same file.
+
+    Processes behind the same IP address can use this to draw from a single rate limit budget per host,
+    and to all back off when any of them is ratelimited. Each update runs in its own write transaction,
+    so the buckets stay consistent no matter how many processes use them.
+
+    Args:
+        path: The database file. It is created if it doesn't exist yet.
+        timeout (optional): The number of seconds to wait for another process to release the database lock.
+    """
+
+    def __init__(self, path: str, timeout: Optional[float] = 10):
+        self.path = path
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+
+        with self._transaction() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS buckets "
+                "(key TEXT PRIMARY KEY, tokens REAL, updated REAL, blocked_until REAL)"
+            )
+
+    def __reduce__(self):
+        return SQLiteRateLimitBackend, (self.path, self.timeout)
+
+    def _after_fork(self) -> None:
+        # The connection is reopened on first use in the child process
+        self._lock = threading.Lock()
+        self._connection = None
+
+    def _connect(self) -> sqlite3.Connection:
+        # SQLite connections must not be shared with forked child processes
+        if self._connection is None or self._pid != os.getpid():
+            self._connection = sqlite3.connect(
+                self.path,
+                timeout=self.timeout,
+                isolation_level=None,
+                check_same_thread=False,
+            )
+            self._pid = os.getpid()
+        return self._connection
+
+    @contextlib.contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        with self._lock:
+            connection = self._connect()
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                yield connection
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+            connection.execute("COMMIT")
+
+    def try_take(self, key: str, rate: float, burst: float, reserve: float) -> float:
+        """Takes a token from the bucket if more than `reserve` tokens would be left over.
+
+        Returns:
+            `0` if a token was taken. Otherwise, the number of seconds until one could be taken.
+        """
+        with self._transaction() as connection:
+            # Wall clock time, as monotonic clocks are not comparable between processes
+            now = time.time()
+            row = connection.execute(
+                "SELECT tokens, updated, blocked_until FROM buckets WHERE key = ?",
+                (key,),
+            ).fetchone()
+            tokens, updated, blocked_until = row or (burst, now, 0.0)
+
+            if blocked_until > now:
+                return blocked_until - now
+
+            tokens = min(burst, tokens + max(now - updated, 0.0) * rate)
+            wait = 0.0
+            if tokens >= reserve + 1:
+                tokens -= 1
+            else:
+                wait = (reserve + 1 - tokens) / rate
+
+            connection.execute(
+                "INSERT OR REPLACE INTO buckets VALUES (?, ?, ?, ?)",
+                (key, tokens, now, blocked_until),
+            )
+            return wait
+
+    def block(self, key: str, seconds: float) -> None:
+        """Stops any process from taking tokens from the bucket for `seconds`"""
+        with self._transaction() as connection:
+            now = time.time()
+            connection.execute(
+                "INSERT INTO buckets VALUES (?, ?, ?, ?) ON CONFLICT (key) DO UPDATE SET "
+                "blocked_until = MAX(buckets.blocked_until, excluded.blocked_until)",
+                (key, 0.0, now, now + seconds),
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+
+class RequestScheduler:
+    """Schedules requests against a per-host rate limit budget.
+
+    Requests are split into two priority classes, `"interactive"` and `"bulk"`, each with its own
+    first-come, first-served queue. Interactive requests are always served first, and a share of the
+    budget is reserved for them, so bulk requests only use spare capacity.
+
+    Args:
+        rate: The number of requests per second allowed to each host.
+        burst (optional): The maximum number of requests that can be made at once after being idle.
+            Defaults to `rate`.
+        interactive_share (optional): The fraction of the burst (0.0 - 1.0) that bulk requests can never use.
+        backend (optional): Where the token buckets are kept. By default, they live in the current process.
+            Pass a `SQLiteRateLimitBackend` to share the budget between processes.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: Optional[float] = None,
+        interactive_share: Optional[float] = 0.2,
+        backend: Optional[Any] = None,
+    ):
+        if rate <= 0:
+            raise ValueError("The rate must be greater than 0.")
+        if not 0 <= interactive_share < 1:
+            raise ValueError("The interactive share must be between 0.0 and 1.0.")
+
+        self.rate = rate
+        self.burst = max(burst or rate, 1)
+        self.interactive_share = interactive_share
+        self.backend = backend or _LocalRateLimitBackend()
+
+        self._condition = threading.Condition()
+        self._queues: Dict[str, Dict[str, Deque[int]]] = {}
+        self._tickets = itertools.count()
+
+    def acquire(
+        self,
+        key: str,
+        priority: Optional[str] = None,
+        timeout: Optional[float] = None,
+    ) -> float:
+        """Blocks until a request to `key` may be made.
+
+        Args:
+            key: The rate limited resource, usually the host.
+            priority (optional): `"interactive"` or `"bulk"`. Defaults to the priority of the current context.
+            timeout (optional): The maximum number of seconds to wait.
+
+        Returns:
+            The number of seconds spent waiting.
+
+        Raises:
+            DeadlineExceeded: If the request could not be scheduled within `timeout`.
+        """
+        priority = priority or _current_priority.get()
+        if priority not in _PRIORITIES:
+            raise ValueError(f"Priority must be one of {', '.join(_PRIORITIES)}.")
+
+        start = time.monotonic()
+        end = None if timeout is None else start + timeout
+        ticket = next(self._tickets)
+
+        with self._condition:
+            queues = self._queues.setdefault(key, {p: deque() for p in _PRIORITIES})
+            queue = queues[priority]
+            queue.append(ticket)
+
+            try:
+                while True:
+                    wait = self._try_take(key, queues, queue, priority, ticket)
+                    if wait == 0:
+                        queue.popleft()
+                        self._condition.notify_all()
+                        return time.monotonic() - start
+
+                    if end is not None:
+                        left = end - time.monotonic()
+                        if left <= 0:
+                            raise DeadlineExceeded
+                        wait = left if wait is None else min(wait, left)
+                    self._condition.wait(wait)
+            except BaseException:
+                if ticket in queue:
+                    queue.remove(ticket)
+                    self._condition.notify_all()
+                raise
+
+    def try_acquire(self, key: str) -> bool:
+        """Takes a token for `key` only if one is available right away and no request is waiting for one.
+
+        This is meant for optional requests, such as hedges, which only use spare bulk capacity and
+        never hold up other requests.
+
+        Returns:
+            Whether the request may be made.
+        """
+        with self._condition:
+            queues = self._queues.get(key)
+            if queues is not None and any(queues.values()):
+                return False
+
+            reserve = min(self.burst * self.interactive_share, self.burst - 1)
+            return self.backend.try_take(key, self.rate, self.burst, reserve) == 0
+
+    def __reduce__(self):
+        # Copies share the budget only if the backend is shared, e.g. a `SQLiteRateLimitBackend`
+        return RequestScheduler, (self.rate, self.burst, self.interactive_share, self.backend)
+
+    def _after_fork(self) -> None:
+        # Requests queued by threads of the parent process will never be made in the child process
+        self._condition = threading.Condition()
+        self._queues = {}
+        after_fork = getattr(self.backend, "_after_fork", None)
+        if after_fork is not None:
+            after_fork()
+
+    def backoff(self, key: str, seconds: float) -> None:
+        """Holds back all requests to `key` for `seconds`, e.g. after being ratelimited.
+        With a shared backend, this applies to every process using it.
+        """
+        self.backend.block(key, seconds)
+
+    def _try_take(
+        self,
+        key: str,
+        queues: Dict[str, Deque[int]],
+        queue: Deque[int],
+        priority: str,
+        ticket: int,
+    ) -> Optional[float]:
+        # Wait for our turn within our own class
+        if queue[0] != ticket:
+            return None
+
+        if priority == INTERACTIVE:
+            reserve = 0.0
+        elif queues[INTERACTIVE]:
+            return None
+        else:
+            reserve = min(self.burst * self.interactive_share, self.burst - 1)
+
+        return self.backend.try_take(key, self.rate, self.burst, reserve)
@@ -0,0 +1,99 @@
+"""Verification of the signatures Mojang puts on profile properties.
+
+Properties are signed with SHA1withRSA (RSASSA-PKCS1-v1_5), and the public keys are published as
+DER-encoded SubjectPublicKeyInfo structures. Only the small subset of DER needed to read an RSA key is
+implemented, so that no cryptography library is required.
+"""
+import base64
+import binascii
+import hashlib
+from typing import Iterable, List, NamedTuple, Tuple
+
+# The DER encoding of the DigestInfo prefix of a SHA-1 digest (RFC 8017, section 9.2)
+_SHA1_DIGEST_INFO = bytes.fromhex("3021300906052b0e03021a05000414")
+# The object identifier of rsaEncryption
+_RSA_ENCRYPTION = bytes.fromhex("2a864886f70d010101")
+
+_SEQUENCE = 0x30
+_INTEGER = 0x02
+_BIT_STRING = 0x03
+_OBJECT_IDENTIFIER = 0x06
+
+
+class _PublicKey(NamedTuple):
+    modulus: int
+    exponent: int
+    size: int
+
+
+def _read_element(data: bytes, offset: int, tag: int) -> Tuple[bytes, int]:
+    """Reads the DER element with `tag` at `offset`, and returns its contents and the offset after it"""
+    if offset + 2 > len(data) or data[offset] != tag:
+        raise ValueError("Malformed public key")
+
+    length = data[offset + 1]
+    offset += 2
+    if length & 0x80:
+        count = length & 0x7F
+        length = int.from_bytes(data[offset : offset + count], "big")
+        offset += count
+
+    end = offset + length
+    if end > len(data):
+        raise ValueError("Malformed public key")
+    return data[offset:end], end
+
+
+def _parse_public_key(der: bytes) -> _PublicKey:
+    """Reads an RSA public key from a DER-encoded SubjectPublicKeyInfo.
+
+    Raises:
+        ValueError: If it isn't a well-formed RSA public key.
+    """
+    info, _ = _read_element(der, 0, _SEQUENCE)
+    algorithm, offset = _read_element(info, 0, _SEQUENCE)
+    oid, _ = _read_element(algorithm, 0, _OBJECT_IDENTIFIER)
+    if oid != _RSA_ENCRYPTION:
+        raise ValueError("Not an RSA public key")
+
+    bits, _ = _read_element(info, offset, _BIT_STRING)
+    # The first byte of a bit string is the number of unused bits
+    key, _ = _read_element(bits[1:], 0, _SEQUENCE)
+    modulus, offset = _read_element(key, 0, _INTEGER)
+    exponent, _ = _read_element(key, offset, _INTEGER)
+
+    modulus = int.from_bytes(modulus, "big")
+    return _PublicKey(modulus, int.from_bytes(exponent, "big"), (modulus.bit_length() + 7) // 8)
+
+
+def _expected_message(value: str, size: int) -> bytes:
+    """Returns the padded message whose signature is valid for `value` with a key of `size` bytes"""
+    digest = _SHA1_DIGEST_INFO + hashlib.sha1(value.encode()).digest()
+    return b"\x00\x01" + b"\xff" * (size - len(digest) - 3) + b"\x00" + digest
+
+
+def _verify(keys: Iterable[_PublicKey], value: str, signature: str) -> bool:
+    """Checks a base64 signature of a property value against every key"""
+    try:
+        signed = int.from_bytes(base64.b64decode(signature, validate=True), "big")
+    except (binascii.Error, ValueError):
+        return False
+
+    for key in keys:
+        if signed >= key.modulus:
+            continue
+        message = pow(signed, key.exponent, key.modulus).to_bytes(key.size, "big")
+        if message == _expected_message(value, key.size):
+            return True
+    return False
+
+
+def _parse_public_keys(encoded: Iterable[str]) -> List[_PublicKey]:
+    """Reads the base64 DER keys of the `publickeys` endpoint, skipping any that aren't RSA keys"""
+    keys = []
+    for key in encoded:
+        try:
+            keys.append(_parse_public_key(base64.b64decode(key)))
+        except (binascii.Error, ValueError):
+            continue
+    return keys
@@ -1,7 +1,72 @@
+import re
+import uuid
 from datetime import datetime
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Tuple, Union
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+
+# An undashed UUID. bytes.fromhex alone would also accept whitespace between the digits.
+_HEX_UUID = re.compile(r"[0-9a-fA-F]{32}")
+
+
+class PlayerUUID(bytes):
+    """A Minecraft UUID packed into 16 bytes.
+
+    Can be created from an undashed or dashed hex string, 16 raw bytes, a `uuid.UUID`, or another `PlayerUUID`.
+    Instances are `bytes` without any per-instance attributes, so they take less memory than the hex string
+    (65 rather than 81 bytes on 64-bit CPython). They are immutable, hashable and ordered, so they can be used as dictionary keys regardless
+    of how the UUID was originally formatted. `str()` returns the undashed form that Mojang's API uses.
+
+    Raises:
+        ValueError: If the value is not a valid UUID.
+    """
+
+    __slots__ = ()
+
+    def __new__(cls, value: Union[str, bytes, uuid.UUID, "PlayerUUID"]):
+        if isinstance(value, PlayerUUID):
+            return value
+        if isinstance(value, uuid.UUID):
+            packed = value.bytes
+        elif isinstance(value, bytes):
+            if len(value) != 16:
+                raise ValueError("A packed UUID must be exactly 16 bytes.")
+            packed = value
+        elif isinstance(value, str):
+            if len(value) == 36 and value[8] == value[13] == value[18] == value[23] == "-":
+                value = value.replace("-", "")
+            if not _HEX_UUID.fullmatch(value):
+                raise ValueError(f"Invalid UUID: {value!r}")
+            packed = bytes.fromhex(value)
+        else:
+            raise TypeError(f"Cannot create a PlayerUUID from {value.__class__.__name__}")
+
+        return super().__new__(cls, packed)
+
+    @property
+    def bytes(self) -> bytes:
+        """The 16 raw bytes"""
+        return bytes(self)
+
+    @property
+    def hex(self) -> str:
+        """The undashed form, e.g. `069a79f444e94726a5befca90e38aaf5`"""
+        return bytes.hex(self)
+
+    @property
+    def dashed(self) -> str:
+        """The dashed form, e.g. `069a79f4-44e9-4726-a5be-fca90e38aaf5`"""
+        h = bytes.hex(self)
+        return f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}"
+
+    def __str__(self) -> str:
+        return bytes.hex(self)
+
+    def __repr__(self) -> str:
+        return f"PlayerUUID('{bytes.hex(self)}')"
+
+    def __reduce__(self):
+        return PlayerUUID, (bytes(self),)
 
 
 @dataclass
@@ -13,6 +78,9 @@ class UserProfile:
     skin_variant: str
     cape_url: Optional[str] = None
     skin_url: Optional[str] = None
+    # The raw textures property and Mojang's signature of it, only set for signed profiles
+    textures_value: Optional[str] = None
+    textures_signature: Optional[str] = None
 
 
 @dataclass
@@ -45,3 +113,68 @@ class NameInformation:
     name_change_allowed: bool
     created_at: Optional[datetime] = None
     changed_at: Optional[datetime] = None
+
+
+@dataclass
+class ValidationResult:
+    """The outcome of validating a batch of usernames or UUIDs.
+
+    `accepted` holds the valid items in their original order, normalized and without duplicates.
+    `rejected` holds `(item, reason)` pairs, where the reason is one of `"type"`, `"length"`,
+    `"characters"` or `"format"`. `duplicates` is the number of valid items dropped as duplicates.
+    """
+
+    accepted: List[str]
+    rejected: List[Tuple[Any, str]]
+    duplicates: int = 0
+
+
+@dataclass
+class Histogram:
+    """A latency histogram, in seconds. `counts[i]` is the number of observations no greater than `bounds[i]`
+    (and greater than the previous bound), the last count is the number of observations above all bounds.
+    """
+
+    bounds: List[float]
+    counts: List[int]
+    count: int = 0
+    total: float = 0.0
+
+    def quantile(self, q: float) -> float:
+        """Estimates the `q` quantile (0.0 - 1.0), e.g. `0.99` for the p99 latency.
+
+        Returns:
+            The upper bound of the bucket the quantile falls into, or `inf` if it is above all bounds.
+        """
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if count and seen >= rank:
+                return bound
+        return float("inf") if self.counts[-1] else 0.0
+
+
+@dataclass
+class Span:
+    """A traced request, the retry of a ratelimited request when `name` is `"retry"`, or the parsing of a
+    response body when `name` is `"parse"`. Retries and parsing are children of the request's span.
+
+    Phase timings are in seconds. Possible phases are `queue` (time spent waiting on the request scheduler),
+    `ratelimit_wait` (time spent sleeping on HTTP 429),
+    `ttfb` (time until the response headers arrived, which includes connection setup),
+    `transfer` (time spent reading the response body) and `parse`.
+    """
+
+    trace_id: str
+    span_id: str
+    name: str
+    method: str
+    url: str
+    start: float
+    duration: float = 0.0
+    parent_id: Optional[str] = None
+    status_code: Optional[int] = None
+    error: Optional[str] = None
+    phases: Dict[str, float] = field(default_factory=dict)
+    headers: Dict[str, str] = field(default_factory=dict)
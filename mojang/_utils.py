@@ -1,3 +1,15 @@
+import base64
+import json
+from typing import Any, Callable, Dict, Optional, Union
+
+import requests
+
+from mojang._types import PlayerUUID
+
+# Headers that are never written to traces or recordings
+_REDACTED_HEADERS = {"authorization", "cookie", "proxy-authorization", "set-cookie"}
+
+
 def _assert_valid_username(username: str) -> None:
     """Raises a ValueError if a username is considered invalid"""
 
@@ -8,3 +20,59 @@ def _assert_valid_username(username: str) -> None:
 
     if not username.isascii():
         raise ValueError("Invalid username. Username contains invalid characters")
+
+
+def _decode_json(
+    response: requests.Response, loads: Callable[[bytes], Any] = json.loads
+) -> Any:
+    """Decodes the raw body of a response, caching the result on the response object.
+
+    The body is decoded at most once, no matter how many times this is called for the same response.
+    Decoding errors are cached as well and raised again as a `ValueError`.
+    """
+    try:
+        data = response._mojang_json
+    except AttributeError:
+        try:
+            data = loads(response.content)
+        except ValueError as exc:
+            data = exc
+        response._mojang_json = data
+
+    if isinstance(data, ValueError):
+        raise data
+    return data
+
+
+def _get_token_expiry(bearer_token: str) -> Optional[int]:
+    """Reads the expiry (UNIX timestamp) from a JWT bearer token. Returns `None` if it can't be read."""
+    token = bearer_token.split(" ")[-1]
+
+    try:
+        payload = token.split(".")[1]
+        payload += "=" * (-len(payload) % 4)
+        exp = json.loads(base64.urlsafe_b64decode(payload))["exp"]
+    except (IndexError, KeyError, TypeError, ValueError):
+        return None
+
+    if not isinstance(exp, (int, float)):
+        return None
+    return int(exp)
+
+
+def _redact_headers(headers: Dict[str, str]) -> Dict[str, str]:
+    return {
+        name: "<redacted>" if name.lower() in _REDACTED_HEADERS else value
+        for name, value in headers.items()
+    }
+
+
+def _normalize_uuid(uuid: Union[str, PlayerUUID]) -> str:
+    """Returns the undashed, lowercase form of a UUID. Strings that aren't UUIDs are returned unchanged."""
+    if isinstance(uuid, PlayerUUID):
+        return uuid.hex
+
+    try:
+        return PlayerUUID(uuid).hex
+    except (TypeError, ValueError):
+        return uuid
@@ -1,12 +1,17 @@
-import ast
 import base64
+import itertools
 import logging
-import json
-from typing import Any, List, Dict, Optional
+import time
+from typing import Any, Iterable, Iterator, List, Dict, Optional, Tuple, Union
 
-from mojang._types import UserProfile
+from mojang._bulk import _map_pipelined, _map_processes, _map_unordered
+from mojang._deadline import _remaining, _with_deadline
+from mojang._types import PlayerUUID, UserProfile
 from mojang._http_client import _HTTPClient
+from mojang._signature import _PublicKey, _parse_public_keys, _verify
+from mojang._utils import _normalize_uuid
 from mojang.errors import MojangError
+from mojang.validation import _validated, validate_usernames, validate_uuids
 
 
 _log = logging.getLogger(__name__)
@@ -15,13 +20,26 @@ _log = logging.getLogger(__name__)
 _API_BASE_URL = "https://api.mojang.com"
 _SESSIONSERVER_BASE_URL = "https://sessionserver.mojang.com"
 _AUTHSERVER_BASE_URL = "https://authserver.mojang.com"
+_SERVICES_BASE_URL = "https://api.minecraftservices.com"
+
+# The number of seconds Mojang's public keys are cached for
+_PROPERTY_KEYS_TTL = 24 * 60 * 60
+
+# The number of UUIDs handed to a worker process at once by `iter_profiles`
+_PROCESS_CHUNK_SIZE = 256
 
 
 class API(_HTTPClient):
+    # The time Mojang's profile property keys were fetched at, and the keys
+    _property_keys: Optional[Tuple[float, List[_PublicKey]]] = None
+
+    @_with_deadline
     def get_uuid(
         self,
         username: str,
         timestamp: Optional[int] = None,
+        *,
+        deadline: Optional[float] = None,
     ) -> Optional[str]:
         """Convert a Minecraft name to a UUID.
 
@@ -36,28 +54,42 @@ class API(_HTTPClient):
             timestamp (optional): Get the username's UUID at a specified UNIX timestamp.
                 You can also get the username's first UUID by passing `0` to this parameter.
                 However, this only works if the name was changed at least once, or if the account is legacy.
+            deadline (optional): The maximum number of seconds this call may take, including any retries.
+                `DeadlineExceeded` is raised once it has passed.
 
         Returns:
             The UUID (`str`) or `None` if the username does not exist.
         """
         if timestamp:
             url = f"{_API_BASE_URL}/users/profiles/minecraft/{username}?at={timestamp}"
+        elif self._is_known_missing(username):
+            return None
         else:
             url = f"{_API_BASE_URL}/users/profiles/minecraft/{username}"
 
         resp = self.request("get", url, ignore_codes=[400])
 
         try:
-            return resp.json()["id"]
-        except (KeyError, json.decoder.JSONDecodeError):
+            return self._json(resp)["id"]
+        except (KeyError, ValueError):
+            if self.negative_cache is not None and not timestamp:
+                self.negative_cache.add(username)
             return None
 
-    def get_uuids(self, names: List[str]) -> Dict[str, str]:
+    @_with_deadline
+    def get_uuids(
+        self,
+        names: List[str],
+        *,
+        deadline: Optional[float] = None,
+    ) -> Dict[str, str]:
         """Convert up to 10 usernames to UUIDs in a single network request.
 
         Args:
             names: The Minecraft username(s) to be converted.
                 If more than 10 are included, only the first 10 will be parsed.
+            deadline (optional): The maximum number of seconds this call may take, including any retries.
+                `DeadlineExceeded` is raised once it has passed.
 
         Returns:
             A dictionary object that contains the converted usernames. Names are also case-corrected.
@@ -71,6 +103,11 @@ class API(_HTTPClient):
         if len(names) > 10:
             names = names[:10]
 
+        if self.negative_cache is not None:
+            names = [name for name in names if not self._is_known_missing(name)]
+            if not names:
+                return {}
+
         resp = self.request(
             "post",
             f"{_API_BASE_URL}/profiles/minecraft",
@@ -78,25 +115,95 @@ class API(_HTTPClient):
             json=names,
         )
 
-        data = resp.json()
+        data = self._json(resp)
 
         if not isinstance(data, list):
             raise MojangError(response=resp)
 
-        return {name_data["name"]: name_data["id"] for name_data in data}
+        uuids = {name_data["name"]: name_data["id"] for name_data in data}
+
+        if self.negative_cache is not None and len(uuids) < len(names):
+            found = {name.lower() for name in uuids}
+            for name in names:
+                if name.lower() not in found:
+                    self.negative_cache.add(name)
+
+        return uuids
+
+    def _reject_input(self, item: Any, reason: str) -> None:
+        _log.debug(f"Skipping invalid input {item!r} ({reason})")
+        self.metrics.increment("rejected_inputs")
+
+    def _is_known_missing(self, username: str) -> bool:
+        if self.negative_cache is None or username not in self.negative_cache:
+            return False
+
+        self.metrics.increment("negative_cache_hits")
+        return True
+
+    def iter_uuids(
+        self,
+        names: Iterable[str],
+        *,
+        deadline: Optional[float] = None,
+        time_budget: Optional[float] = None,
+        validate: Optional[bool] = False,
+    ) -> Iterator[Tuple[str, PlayerUUID]]:
+        """Convert any number of usernames to UUIDs, 10 names per network request.
+
+        Results are yielded as soon as each request completes, so the names can be streamed in from a
+        file and the results into a sink (see `mojang.sinks`) without holding everything in memory.
+        Requests are made concurrently with the `"bulk"` priority. The number of concurrent requests
+        adapts to ratelimiting and response times, up to `max_concurrency`.
 
-    def get_username(self, uuid: str) -> Optional[str]:
+        Args:
+            names: The Minecraft usernames to be converted.
+            deadline (optional): The maximum number of seconds each request may take.
+            time_budget (optional): The maximum number of seconds the whole operation may take. Once it has
+                passed, outstanding requests are cancelled and iteration stops after the results so far.
+            validate (optional): Check the names with `mojang.validation.validate_usernames` first, and drop
+                duplicates. Invalid names are skipped without a request and counted in the `rejected_inputs` metric.
+
+        Yields:
+            `(name, uuid)` pairs in the order they arrive, with the UUID as a compact `PlayerUUID`. Names are
+            case-corrected, and names that do not exist are skipped.
+        """
+        if validate:
+            names = _validated(names, validate_usernames, str.lower, self._reject_input)
+
+        names = iter(names)
+        chunks = iter(lambda: list(itertools.islice(names, 10)), [])
+
+        for uuids in _map_unordered(
+            self._bulk(self.get_uuids, deadline=deadline),
+            chunks,
+            self.concurrency,
+            self.ratelimit_sleep_time,
+            time_budget,
+        ):
+            for name, uuid in uuids.items():
+                yield name, PlayerUUID(uuid)
+
+    @_with_deadline
+    def get_username(
+        self,
+        uuid: Union[str, PlayerUUID],
+        *,
+        deadline: Optional[float] = None,
+    ) -> Optional[str]:
         """Convert a UUID to a username.
 
         Args:
-            uuid: The Minecraft UUID to be converted to a username.
+            uuid: The Minecraft UUID to be converted to a username. Dashed and undashed UUIDs are both accepted.
+            deadline (optional): The maximum number of seconds this call may take, including any retries.
+                `DeadlineExceeded` is raised once it has passed.
 
         Returns:
             The username. `None` otherwise.
         """
         resp = self.request(
             "get",
-            f"{_SESSIONSERVER_BASE_URL}/session/minecraft/profile/{uuid}",
+            f"{_SESSIONSERVER_BASE_URL}/session/minecraft/profile/{_normalize_uuid(uuid)}",
             ignore_codes=[400],
         )
 
@@ -104,30 +211,19 @@ class API(_HTTPClient):
             return None
 
         try:
-            return resp.json()["name"]
-        except json.decoder.JSONDecodeError:
+            return self._json(resp)["name"]
+        except ValueError:
             return None
 
-    def get_profile(self, uuid: str) -> Optional[UserProfile]:
-        """Get more information about a user from their UUID
-
-        Args:
-            uuid: The Minecraft UUID
-
-        Returns:
-            `UserProfile` object. Otherwise, `None` if the profile does not exist.
-        """
-        resp = self.request(
-            "get",
-            f"{_SESSIONSERVER_BASE_URL}/session/minecraft/profile/{uuid}",
-            ignore_codes=[400],
-        )
-
+    def _parse_profile(self, resp: Any) -> Optional[UserProfile]:
+        """Reads a `UserProfile` from the textures property of a profile response"""
         try:
-            value = resp.json()["properties"][0]["value"]
-        except (KeyError, json.decoder.JSONDecodeError):
+            prop = self._json(resp)["properties"][0]
+            value = prop["value"]
+        except (KeyError, ValueError):
             return None
-        data = ast.literal_eval(base64.b64decode(value).decode())
+        signature = prop.get("signature")
+        data = self.json_loads(base64.b64decode(value))
 
         cape_url = None
         skin_url = None
@@ -151,26 +247,332 @@ class API(_HTTPClient):
             cape_url=cape_url,
             skin_url=skin_url,
             skin_variant=skin_variant,
+            textures_value=value if signature else None,
+            textures_signature=signature,
+        )
+
+    @_with_deadline
+    def get_profile(
+        self,
+        uuid: Union[str, PlayerUUID],
+        signed: Optional[bool] = False,
+        *,
+        deadline: Optional[float] = None,
+    ) -> Optional[UserProfile]:
+        """Get more information about a user from their UUID
+
+        Args:
+            uuid: The Minecraft UUID. Dashed and undashed UUIDs are both accepted.
+            signed (optional): Request Mojang's signature of the textures, which is kept in the profile's
+                `textures_value` and `textures_signature`, so that it can be checked later with `verify_profile`.
+            deadline (optional): The maximum number of seconds this call may take, including any retries.
+                `DeadlineExceeded` is raised once it has passed.
+
+        Returns:
+            `UserProfile` object. Otherwise, `None` if the profile does not exist.
+        """
+        resp = self.request(
+            "get",
+            f"{_SESSIONSERVER_BASE_URL}/session/minecraft/profile/{_normalize_uuid(uuid)}",
+            ignore_codes=[400],
+            params={"unsigned": "false"} if signed else None,
         )
 
-    def get_blocked_servers(self) -> List[str]:
+        return self._parse_profile(resp)
+
+    def iter_profiles(
+        self,
+        uuids: Iterable[Union[str, PlayerUUID]],
+        *,
+        deadline: Optional[float] = None,
+        time_budget: Optional[float] = None,
+        validate: Optional[bool] = False,
+        processes: Optional[int] = None,
+    ) -> Iterator[UserProfile]:
+        """Get the profiles of any number of UUIDs.
+
+        Profiles are yielded as soon as they are fetched, so the UUIDs can be streamed in from a
+        file and the results into a sink (see `mojang.sinks`) without holding everything in memory.
+        Requests are made concurrently with the `"bulk"` priority. The number of concurrent requests
+        adapts to ratelimiting and response times, up to `max_concurrency`.
+
+        Args:
+            uuids: The Minecraft UUIDs.
+            deadline (optional): The maximum number of seconds each request may take.
+            time_budget (optional): The maximum number of seconds the whole operation may take. Once it has
+                passed, outstanding requests are cancelled and iteration stops after the results so far.
+            validate (optional): Check and normalize the UUIDs with `mojang.validation.validate_uuids` first,
+                and drop duplicates. Invalid UUIDs are skipped without a request and counted in the
+                `rejected_inputs` metric.
+            processes (optional): Spread the fetching and decoding of profiles over this many worker
+                processes, each with a copy of this client. A rate limit budget kept in this process by
+                the `scheduler` is split evenly between the workers, a `SQLiteRateLimitBackend` is shared.
+
+        Yields:
+            `UserProfile` objects in the order they arrive. UUIDs without a profile are skipped.
+        """
+        if validate:
+            uuids = _validated(uuids, validate_uuids, str, self._reject_input)
+
+        if processes:
+            yield from _map_processes(
+                self,
+                "iter_profiles",
+                uuids,
+                processes,
+                _PROCESS_CHUNK_SIZE,
+                time_budget,
+                deadline=deadline,
+            )
+            return
+
+        for profile in _map_unordered(
+            self._bulk(self.get_profile, deadline=deadline),
+            uuids,
+            self.concurrency,
+            self.ratelimit_sleep_time,
+            time_budget,
+        ):
+            if profile is not None:
+                yield profile
+
+    def resolve_profiles(
+        self,
+        names: Iterable[str],
+        *,
+        deadline: Optional[float] = None,
+        time_budget: Optional[float] = None,
+        validate: Optional[bool] = False,
+    ) -> Iterator[UserProfile]:
+        """Get the profiles of any number of usernames.
+
+        The two steps are pipelined: as soon as a batch of 10 names is converted to UUIDs, the profiles of
+        those UUIDs are fetched, while the next batches are still being converted. Fetching profiles takes
+        precedence over converting more names, so converted UUIDs never pile up. Requests are made
+        concurrently with the `"bulk"` priority, like `iter_uuids` and `iter_profiles`.
+
+        Args:
+            names: The Minecraft usernames.
+            deadline (optional): The maximum number of seconds each request may take.
+            time_budget (optional): The maximum number of seconds the whole operation may take. Once it has
+                passed, outstanding requests are cancelled and iteration stops after the results so far.
+            validate (optional): Check the names with `mojang.validation.validate_usernames` first, and drop
+                duplicates. Invalid names are skipped without a request and counted in the `rejected_inputs` metric.
+
+        Yields:
+            `UserProfile` objects in the order they arrive. Names that do not exist are skipped.
+        """
+        if validate:
+            names = _validated(names, validate_usernames, str.lower, self._reject_input)
+
+        names = iter(names)
+        chunks = iter(lambda: list(itertools.islice(names, 10)), [])
+        get_uuids = self._bulk(self.get_uuids, deadline=deadline)
+
+        for profile in _map_pipelined(
+            lambda chunk: get_uuids(chunk).values(),
+            self._bulk(self.get_profile, deadline=deadline),
+            chunks,
+            self.concurrency,
+            self.ratelimit_sleep_time,
+            time_budget,
+        ):
+            if profile is not None:
+                yield profile
+
+    @_with_deadline
+    def has_joined(
+        self,
+        username: str,
+        server_id: str,
+        ip: Optional[str] = None,
+        *,
+        deadline: Optional[float] = None,
+    ) -> Optional[UserProfile]:
+        """Check that a player has joined a server through the Minecraft client, to authenticate them on login.
+
+        Concurrent calls with the same arguments share a single request. The time every call takes is
+        recorded in the `has_joined` histogram of `metrics` (see `metrics.histogram`).
+
+        Args:
+            username: The name the player logged in with.
+            server_id: The server hash the player joined with.
+            ip (optional): Also check that the player joined from this IP address.
+            deadline (optional): The maximum number of seconds this call may take, including any retries.
+                `DeadlineExceeded` is raised once it has passed.
+
+        Returns:
+            The player's `UserProfile`, or `None` if they haven't joined the server.
+        """
+        params = {"username": username, "serverId": server_id}
+        if ip is not None:
+            params["ip"] = ip
+
+        def check() -> Optional[UserProfile]:
+            resp = self.request(
+                "get",
+                f"{_SESSIONSERVER_BASE_URL}/session/minecraft/hasJoined",
+                params=params,
+            )
+            return self._parse_profile(resp)
+
+        start = time.monotonic()
+        try:
+            return self._single_flight.do(
+                ("has_joined", username.lower(), server_id, ip), check, _remaining()
+            )
+        finally:
+            self.metrics.observe("has_joined", time.monotonic() - start)
+
+    def has_joined_many(
+        self,
+        joins: Iterable[Tuple[str, ...]],
+        *,
+        deadline: Optional[float] = None,
+        time_budget: Optional[float] = None,
+    ) -> Iterator[Tuple[Tuple[str, ...], Optional[UserProfile]]]:
+        """Check any number of logins with `has_joined`, such as the queue of players waiting to join a server.
+
+        Logins are checked concurrently by a bounded pool of at most `max_concurrency` requests, which adapts
+        to ratelimiting and response times. Unlike the other bulk operations, requests keep the
+        `"interactive"` priority, since players are waiting on them. Duplicate logins that are checked at the
+        same time share a single request.
+
+        Args:
+            joins: `(username, server_id)` or `(username, server_id, ip)` tuples.
+            deadline (optional): The maximum number of seconds each check may take.
+            time_budget (optional): The maximum number of seconds the whole operation may take. Once it has
+                passed, outstanding requests are cancelled and iteration stops after the results so far.
+
+        Yields:
+            `(join, profile)` pairs in the order they complete. `profile` is `None` if the player hasn't joined.
+        """
+
+        def check(join: Tuple[str, ...]) -> Tuple[Tuple[str, ...], Optional[UserProfile]]:
+            return join, self.has_joined(*join, deadline=deadline)
+
+        yield from _map_unordered(
+            check,
+            joins,
+            self.concurrency,
+            self.ratelimit_sleep_time,
+            time_budget,
+        )
+
+    def _get_property_keys(self) -> List[_PublicKey]:
+        """Returns Mojang's profile property keys, fetching them if they aren't cached or have expired"""
+        cached = self._property_keys
+        if cached is not None and time.monotonic() - cached[0] < _PROPERTY_KEYS_TTL:
+            return cached[1]
+
+        resp = self.request("get", f"{_SERVICES_BASE_URL}/publickeys")
+        keys = _parse_public_keys(
+            key["publicKey"] for key in self._json(resp).get("profilePropertyKeys", [])
+        )
+        self._property_keys = (time.monotonic(), keys)
+        return keys
+
+    def _is_signed_by(self, keys: List[_PublicKey], profile: UserProfile) -> bool:
+        if not profile.textures_value or not profile.textures_signature:
+            return False
+        if not _verify(keys, profile.textures_value, profile.textures_signature):
+            return False
+
+        # The signature only covers the raw property, the fields of the profile have to match it as well
+        try:
+            data = self.json_loads(base64.b64decode(profile.textures_value))
+        except ValueError:
+            return False
+        return data.get("profileId") == profile.id and data.get("profileName") == profile.name
+
+    @_with_deadline
+    def verify_profile(
+        self,
+        profile: UserProfile,
+        *,
+        deadline: Optional[float] = None,
+    ) -> bool:
+        """Check that the textures of a profile were signed by Mojang, without a request to the session server.
+
+        Mojang's public keys are fetched once and cached in memory for a day. A signed profile can be
+        fetched with `get_profile(uuid, signed=True)`, and profiles returned by `has_joined` are always signed.
+
+        Args:
+            profile: The profile to check.
+            deadline (optional): The maximum number of seconds this call may take, including any retries.
+                `DeadlineExceeded` is raised once it has passed.
+
+        Returns:
+            `True` if the signature is valid and matches the profile, `False` if it is invalid or missing.
+        """
+        return self._is_signed_by(self._get_property_keys(), profile)
+
+    @_with_deadline
+    def verify_profiles(
+        self,
+        profiles: Iterable[UserProfile],
+        *,
+        deadline: Optional[float] = None,
+    ) -> List[bool]:
+        """Check the signatures of any number of profiles with `verify_profile`.
+
+        The keys are looked up once for the whole batch, and a profile that appears several times
+        is only checked once.
+
+        Args:
+            profiles: The profiles to check.
+            deadline (optional): The maximum number of seconds this call may take, including any retries.
+                `DeadlineExceeded` is raised once it has passed.
+
+        Returns:
+            Whether each profile is validly signed, in the same order as `profiles`.
+        """
+        keys = self._get_property_keys()
+        checked: Dict[Tuple[Any, ...], bool] = {}
+        results = []
+
+        for profile in profiles:
+            key = (profile.id, profile.name, profile.textures_value, profile.textures_signature)
+            if key not in checked:
+                checked[key] = self._is_signed_by(keys, profile)
+            results.append(checked[key])
+
+        return results
+
+    @_with_deadline
+    def get_blocked_servers(
+        self,
+        *,
+        deadline: Optional[float] = None,
+    ) -> List[str]:
         """Get a list of SHA1 hashes of blacklisted Minecraft servers that do not follow EULA.
         These servers have to abide by the EULA or they will be shut down forever. The hashes are not cracked.
 
+        Args:
+            deadline (optional): The maximum number of seconds this call may take, including any retries.
+                `DeadlineExceeded` is raised once it has passed.
+
         Returns:
             Blacklisted server hashes
         """
         resp = self.request("get", f"{_SESSIONSERVER_BASE_URL}/blockedservers")
         return resp.text.splitlines()
 
+    @_with_deadline
     def refresh_access_token(
-        self, access_token: str, client_token: str
+        self,
+        access_token: str,
+        client_token: str,
+        *,
+        deadline: Optional[float] = None,
     ) -> Dict[str, Any]:
         """Refreshes access token
 
         Args:
             access_token: The access token to refresh.
             client_token: The client token that was used to obtain the access token.
+            deadline (optional): The maximum number of seconds this call may take, including any retries.
+                `DeadlineExceeded` is raised once it has passed.
 
         Returns:
             A dictionary object that contains the new access token and other account and profile information
@@ -182,9 +584,9 @@ class API(_HTTPClient):
         }
 
         account = {}
-        data = self.request(
-            "post", f"{_AUTHSERVER_BASE_URL}/refresh", json=payload
-        ).json()
+        data = self._json(
+            self.request("post", f"{_AUTHSERVER_BASE_URL}/refresh", json=payload)
+        )
 
         account["username"] = data["user"]["username"]
         account["uuid"] = data["user"]["id"]
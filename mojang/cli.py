@@ -0,0 +1,304 @@
+"""The `mojang` command-line interface, for bulk jobs that would otherwise need a script around `API`.
+
+Input is read line by line from the given files, or from stdin. Blank lines and lines starting
+with `#` are skipped. Results are streamed into the output as they arrive, while the progress,
+throughput and error count are reported on stderr.
+
+Examples:
+    mojang uuids names.txt -o uuids.csv
+    cat uuids.txt | mojang profiles -j 16 > profiles.ndjson
+    mojang blocked-servers hosts.txt --format csv
+"""
+import argparse
+import hashlib
+import ipaddress
+import itertools
+import logging
+import sys
+import threading
+import time
+from typing import Any, Callable, Iterator, List, Optional, TextIO, Tuple
+
+import requests
+
+from mojang import sinks
+from mojang._bulk import _map_unordered
+from mojang.api import API
+from mojang.errors import MojangError, TooManyRequests
+
+_log = logging.getLogger(__name__)
+
+_FORMATS = {
+    "ndjson": sinks.NDJSONSink,
+    "csv": sinks.CSVSink,
+    "sqlite": sinks.SQLiteSink,
+    "parquet": sinks.ParquetSink,
+}
+
+_EXTENSIONS = {
+    ".csv": "csv",
+    ".db": "sqlite",
+    ".sqlite": "sqlite",
+    ".sqlite3": "sqlite",
+    ".parquet": "parquet",
+}
+
+
+class _Progress:
+    """Reports the number of processed items, the throughput and the number of errors on stderr"""
+
+    def __init__(self, stream: TextIO, enabled: bool):
+        self.stream = stream
+        self.enabled = enabled
+        self.done = 0
+        self.missing = 0
+        self.errors = 0
+        self._start = time.monotonic()
+        self._stop = threading.Event()
+        # Overwrite a single line on terminals, otherwise don't flood logs with updates
+        self._interactive = stream.isatty()
+        self._thread = None
+
+        if enabled:
+            self._thread = threading.Thread(
+                target=self._run,
+                args=(0.2 if self._interactive else 5,),
+                daemon=True,
+            )
+            self._thread.start()
+
+    def _run(self, interval: float) -> None:
+        while not self._stop.wait(interval):
+            self._report()
+
+    def _report(self, final: bool = False) -> None:
+        elapsed = time.monotonic() - self._start
+        rate = self.done / elapsed if elapsed > 0 else 0.0
+        line = (
+            f"{self.done} done, {self.missing} not found, {self.errors} errors, "
+            f"{rate:.1f}/s, {elapsed:.0f}s elapsed"
+        )
+        if self._interactive:
+            self.stream.write(f"\r{line}\033[K" + ("\n" if final else ""))
+        else:
+            self.stream.write(line + "\n")
+        self.stream.flush()
+
+    def close(self) -> None:
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._report(final=True)
+
+
+def _read_lines(paths: List[str]) -> Iterator[str]:
+    """Yields the stripped, non-empty lines of every file. `-` is stdin."""
+    for path in paths or ["-"]:
+        if path == "-":
+            lines = sys.stdin
+        else:
+            lines = open(path, encoding="utf-8")
+
+        try:
+            for line in lines:
+                line = line.strip()
+                if line and not line.startswith("#"):
+                    yield line
+        finally:
+            if lines is not sys.stdin:
+                lines.close()
+
+
+def _guarded(func: Callable[[Any], Any]) -> Callable[[Any], Tuple[Any, Any, Any]]:
+    """Wraps `func` so that a failing item is returned with its error instead of stopping the whole job"""
+
+    def call(item: Any) -> Tuple[Any, Any, Any]:
+        try:
+            return item, func(item), None
+        except TooManyRequests:
+            # Retried with a back-off by the bulk runner
+            raise
+        except (MojangError, requests.RequestException) as exc:
+            return item, None, exc
+
+    return call
+
+
+def _blocked_patterns(host: str) -> List[str]:
+    """Returns the strings the blocked server list is checked against for a server address.
+
+    The address itself is always checked. Domains are also checked against a wildcard for every parent
+    domain (`*.example.com`, `*.com`), and IPv4 addresses against a wildcard for every prefix (`1.2.3.*`).
+    """
+    host = host.strip().lower().rstrip(".")
+    # Drop a port, but not the colons of an IPv6 address
+    if host.count(":") == 1:
+        host = host.split(":")[0]
+
+    patterns = [host]
+    try:
+        address = ipaddress.ip_address(host)
+    except ValueError:
+        labels = host.split(".")
+        patterns += ["*." + ".".join(labels[i:]) for i in range(1, len(labels))]
+    else:
+        if address.version == 4:
+            octets = host.split(".")
+            patterns += [".".join(octets[:i]) + ".*" for i in range(3, 0, -1)]
+    return patterns
+
+
+def _uuids(api: API, args: argparse.Namespace, progress: _Progress) -> Iterator[Any]:
+    names = _read_lines(args.inputs)
+    chunks = iter(lambda: list(itertools.islice(names, 10)), [])
+
+    for chunk, uuids, error in _map_unordered(
+        _guarded(api._bulk(api.get_uuids)),
+        chunks,
+        api.concurrency,
+        api.ratelimit_sleep_time,
+    ):
+        progress.done += len(chunk)
+        if error is not None:
+            progress.errors += len(chunk)
+            _log.warning(f"Could not resolve {', '.join(chunk)}: {error!r}")
+            continue
+
+        progress.missing += len(chunk) - len(uuids)
+        for name, uuid in uuids.items():
+            yield {"name": name, "id": uuid}
+
+
+def _profiles(api: API, args: argparse.Namespace, progress: _Progress) -> Iterator[Any]:
+    for uuid, profile, error in _map_unordered(
+        _guarded(api._bulk(api.get_profile)),
+        _read_lines(args.inputs),
+        api.concurrency,
+        api.ratelimit_sleep_time,
+    ):
+        progress.done += 1
+        if error is not None:
+            progress.errors += 1
+            _log.warning(f"Could not fetch the profile of {uuid}: {error!r}")
+        elif profile is None:
+            progress.missing += 1
+        else:
+            yield profile
+
+
+def _blocked_servers(
+    api: API, args: argparse.Namespace, progress: _Progress
+) -> Iterator[Any]:
+    blocked = set(api.get_blocked_servers())
+
+    for host in _read_lines(args.inputs):
+        match = None
+        for pattern in _blocked_patterns(host):
+            if hashlib.sha1(pattern.encode()).hexdigest() in blocked:
+                match = pattern
+                break
+
+        progress.done += 1
+        yield {"host": host, "blocked": match is not None, "pattern": match}
+
+
+_COMMANDS = {
+    "uuids": (_uuids, "id"),
+    "profiles": (_profiles, "id"),
+    "blocked-servers": (_blocked_servers, "host"),
+}
+
+
+def _parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="mojang", description="Run bulk operations against the Mojang API."
+    )
+    parser.add_argument(
+        "command",
+        choices=list(_COMMANDS),
+        help="uuids: convert usernames to UUIDs, profiles: fetch the profiles of UUIDs, "
+        "blocked-servers: check server addresses against the blocked server list",
+    )
+    parser.add_argument(
+        "inputs",
+        nargs="*",
+        metavar="FILE",
+        help="Files with one input per line. Reads stdin if none are given, or for '-'.",
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        default="-",
+        help="The output file. Defaults to stdout.",
+    )
+    parser.add_argument(
+        "-f",
+        "--format",
+        choices=list(_FORMATS),
+        help="The output format. Guessed from the output file extension, otherwise ndjson.",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=8,
+        help="The maximum number of concurrent requests (default: 8).",
+    )
+    parser.add_argument(
+        "-q", "--quiet", action="store_true", help="Don't report progress on stderr."
+    )
+    parser.add_argument(
+        "-v", "--verbose", action="store_true", help="Log every failed item on stderr."
+    )
+    return parser
+
+
+def run(args: argparse.Namespace, api: Optional[API] = None) -> int:
+    """Runs a parsed command.
+
+    Returns:
+        The exit code: `0` if every item was processed, `1` if some failed, and `2` if the job was interrupted.
+    """
+    output_format = args.format
+    if output_format is None:
+        output_format = next(
+            (fmt for ext, fmt in _EXTENSIONS.items() if args.output.endswith(ext)),
+            "ndjson",
+        )
+    if args.output == "-" and output_format in ("sqlite", "parquet"):
+        raise SystemExit(f"mojang: the {output_format} format requires --output")
+    if args.jobs < 1:
+        raise SystemExit("mojang: --jobs must be at least 1")
+
+    if api is None:
+        api = API(max_concurrency=args.jobs)
+
+    command, key = _COMMANDS[args.command]
+    path = sys.stdout if args.output == "-" else args.output
+    kwargs = {"key": key} if output_format == "sqlite" else {}
+    # Flush every record to stdout, so results can be piped into another program as they arrive
+    if path is sys.stdout:
+        kwargs["batch_size"] = 1
+
+    progress = _Progress(sys.stderr, enabled=not args.quiet)
+    try:
+        with _FORMATS[output_format](path, **kwargs) as sink:
+            sink.write_many(command(api, args, progress))
+    except KeyboardInterrupt:
+        return 2
+    except MojangError as exc:
+        sys.stderr.write(f"mojang: {exc!r}\n")
+        return 2
+    finally:
+        progress.close()
+
+    return 1 if progress.errors else 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = _parser().parse_args(argv)
+    logging.basicConfig(
+        level=logging.INFO if args.verbose else logging.ERROR,
+        format="%(levelname)s: %(message)s",
+    )
+    return run(args)
@@ -1,28 +1,40 @@
-import ast
 import base64
 import logging
-from typing import Any, Dict, List, Optional, Tuple
+import threading
+import time
+import weakref
+from typing import Any, Dict, List, Optional, Tuple, Union
 import re
 
 import requests
 
+from mojang._deadline import _with_deadline
 from mojang._http_client import _HTTPClient
-from mojang._types import Profile, Skin, Cape, NameInformation
+from mojang.api import API
+from mojang._types import Profile, Skin, Cape, NameInformation, PlayerUUID
 from mojang.errors import (
     MojangError,
     BadRequest,
     LoginFailure,
     MissingMinecraftLicense,
     MissingMinecraftProfile,
+    Unauthorized,
 )
 
-from mojang._utils import _assert_valid_username
+from mojang._utils import (
+    _assert_valid_username,
+    _get_token_expiry,
+    _normalize_uuid,
+)
 
 
 _log = logging.getLogger(__name__)
 
 
 _BASE_API_URL = "https://api.minecraftservices.com"
+# Drops the session's bearer token from a request. The login requests are made on the shared session,
+# where the old token has to stay in place for other threads until the login has succeeded.
+_WITHOUT_AUTHORIZATION = {"Authorization": None}
 
 
 class MojangAuth(_HTTPClient):
@@ -44,12 +56,51 @@ class MojangAuth(_HTTPClient):
         retry_on_ratelimit: Optional[bool] = False,
         ratelimit_sleep_time: Optional[int] = 60,
         debug_mode: Optional[bool] = False,
+        client_token: Optional[str] = None,
+        auto_refresh: Optional[bool] = False,
+        refresh_margin: Optional[int] = 300,
+        cache_profile: Optional[bool] = False,
+        **kwargs: Any,
     ):
-        super().__init__(session, retry_on_ratelimit, ratelimit_sleep_time, debug_mode)
+        """
+        Args:
+            email (optional): The Microsoft account email.
+            password (optional): The Microsoft account password.
+            bearer_token (optional): Skip the Microsoft login and use this bearer token instead.
+            client_token (optional): The client token the bearer token was obtained with. If supplied, the
+                bearer token is refreshed through the authserver instead of logging in again.
+            auto_refresh (optional): Refresh the bearer token in a background thread shortly before it expires.
+            refresh_margin (optional): How many seconds before expiry the background refresh happens.
+            cache_profile (optional): Cache the profile and name change information. The cache is updated
+                or invalidated by this client's own changes (skin, cape and username), so reads between
+                changes don't make any requests. Changes made elsewhere, e.g. on minecraft.net, are only
+                picked up after calling `invalidate_profile_cache`.
+
+        The remaining arguments are passed on to the HTTP client.
+
+        Note:
+            Whenever the bearer token can be refreshed (an email/password or client token is available),
+            a request that fails with `Unauthorized` is retried once after refreshing the token.
+        """
+        super().__init__(
+            session, retry_on_ratelimit, ratelimit_sleep_time, debug_mode, **kwargs
+        )
 
         self.email = email
         self.password = password
         self.bearer_token = bearer_token
+        self.client_token = client_token
+        self.auto_refresh = auto_refresh
+        self.refresh_margin = refresh_margin
+
+        self._refresh_lock = threading.Lock()
+        self._refresh_state = threading.local()
+        self._refresh_timer: Optional[threading.Timer] = None
+
+        self.cache_profile = cache_profile
+        self._profile_cache: Dict[str, Any] = {}
+        self._profile_cache_lock = threading.Lock()
+        self._profile_cache_generation = 0
 
         if bearer_token:
             self._set_authorization_header(bearer_token)
@@ -61,20 +112,209 @@ class MojangAuth(_HTTPClient):
             self._login()
 
         self._validate_session()
+        self._schedule_refresh()
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        ignore_codes: Optional[List[int]] = None,
+        **kwargs: Any,
+    ) -> Any:
+        """Internal request handler that retries once with a refreshed bearer token on HTTP 401"""
+        stale_header = self.session.headers.get("Authorization")
+
+        try:
+            return super().request(method, url, ignore_codes, **kwargs)
+        except Unauthorized:
+            # Without a bearer token, this is the login itself failing, which retrying would only repeat
+            if (
+                stale_header is None
+                or not self._can_refresh()
+                or getattr(self._refresh_state, "active", False)
+            ):
+                raise
+
+        _log.info("Bearer token was rejected. Refreshing it and retrying the request.")
+        self._refresh_bearer_token(stale_header)
+        return super().request(method, url, ignore_codes, **kwargs)
 
     def _set_authorization_header(self, bearer_token: str) -> None:
         if not bearer_token.startswith("Bearer"):
             _log.debug("Appended Bearer string onto the token as it was missing")
             bearer_token = f"Bearer {bearer_token}"
 
-        _log.debug(f"Setting authorization header to {bearer_token}")
+        _log.debug("Setting authorization header")
         self.session.headers.update({"Authorization": f"{bearer_token}"})
 
+    def _can_refresh(self) -> bool:
+        return bool((self.email and self.password) or self.client_token)
+
+    @_with_deadline
+    def refresh_bearer_token(
+        self,
+        *,
+        deadline: Optional[float] = None,
+    ) -> None:
+        """Obtain a new bearer token, either by logging in again or through the authserver if a
+        client token was supplied. The new token is available through the `bearer_token` attribute.
+
+        Args:
+            deadline (optional): The maximum number of seconds this call may take, including any retries.
+                `DeadlineExceeded` is raised once it has passed.
+
+        Raises:
+            TypeError: If neither an email/password nor a client token is available.
+        """
+        if not self._can_refresh():
+            raise TypeError(
+                "Either an email/password or client token is required to refresh the bearer token."
+            )
+        self._refresh_bearer_token(self.session.headers.get("Authorization"))
+
+    def _refresh_bearer_token(self, stale_header: Optional[str]) -> None:
+        with self._refresh_lock:
+            # Another thread already replaced the token that was rejected
+            if self.session.headers.get("Authorization") != stale_header:
+                return
+
+            self._refresh_state.active = True
+            try:
+                if self.email and self.password:
+                    # The old token stays in place for other threads until the new one is set by `_login`
+                    self._login()
+                else:
+                    account = API(
+                        session=self.session,
+                        retry_on_ratelimit=self.retry_on_ratelimit,
+                        ratelimit_sleep_time=self.ratelimit_sleep_time,
+                        json_loads=self.json_loads,
+                    ).refresh_access_token(
+                        self.bearer_token.split(" ")[-1], self.client_token
+                    )
+                    self.bearer_token = account["access_token"]
+                    self.client_token = account["client_token"]
+                    self._set_authorization_header(self.bearer_token)
+            finally:
+                self._refresh_state.active = False
+
+        _log.debug("Bearer token refreshed")
+        self._schedule_refresh()
+
+    def _schedule_refresh(self, delay: Optional[float] = None) -> None:
+        """Starts a background timer that refreshes the bearer token before it expires"""
+        if not self.auto_refresh or not self._can_refresh():
+            return
+
+        if delay is None:
+            expiry = _get_token_expiry(self.bearer_token)
+            if expiry is None:
+                _log.debug("The bearer token expiry could not be read. Skipping background refresh.")
+                return
+            delay = max(expiry - self.refresh_margin - time.time(), 0)
+
+        if self._refresh_timer is not None:
+            self._refresh_timer.cancel()
+
+        # The timer only holds a weak reference so that it doesn't keep the client alive
+        self._refresh_timer = threading.Timer(
+            delay, _background_refresh, args=(weakref.ref(self),)
+        )
+        self._refresh_timer.daemon = True
+        self._refresh_timer.start()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = super().__getstate__()
+        for name in ("_refresh_lock", "_refresh_state", "_refresh_timer", "_profile_cache_lock"):
+            del state[name]
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        super().__setstate__(state)
+        self._reset_locks()
+        if self._owns_session:
+            self._set_authorization_header(self.bearer_token)
+
+    def _after_fork(self) -> None:
+        super()._after_fork()
+        self._reset_locks()
+
+    def _reset_locks(self) -> None:
+        # The refresh timer doesn't exist in a copy or a forked child, so the background refresh only
+        # resumes after the token was refreshed on demand. Otherwise, every process would refresh the token,
+        # invalidating the one the other processes use.
+        self._refresh_lock = threading.Lock()
+        self._refresh_state = threading.local()
+        self._refresh_timer = None
+        self._profile_cache_lock = threading.Lock()
+
     def _has_minecraft_profile(self) -> bool:
         # This check still needs to be verified
         resp = self.request("get", f"{_BASE_API_URL}/minecraft/profile")
+        if resp.ok:
+            self._store_profile(resp)
         return bool(resp.ok)
 
+    def invalidate_profile_cache(self) -> None:
+        """Drop the cached profile and name change information, so that they are fetched again on the next read.
+        Only needed when `cache_profile` is enabled and the profile was changed outside of this client.
+        """
+        with self._profile_cache_lock:
+            self._profile_cache_generation += 1
+            self._profile_cache.clear()
+
+    def _get_cached(self, key: str, url: str) -> Any:
+        """Fetches JSON data, or returns it from the profile cache if it is enabled"""
+        if not self.cache_profile:
+            return self._json(self.request("get", url))
+
+        with self._profile_cache_lock:
+            if key in self._profile_cache:
+                return self._profile_cache[key]
+            generation = self._profile_cache_generation
+
+        data = self._json(self.request("get", url))
+
+        with self._profile_cache_lock:
+            # Don't store the data if a change was made while it was being fetched
+            if self._profile_cache_generation == generation:
+                self._profile_cache[key] = data
+        return data
+
+    def _store_profile(self, resp: requests.Response, name_changed: bool = False) -> None:
+        """Updates the cache with the profile returned by a request, or drops it if there is none"""
+        if not self.cache_profile:
+            return
+
+        try:
+            data = self._json(resp)
+        except ValueError:
+            data = None
+
+        with self._profile_cache_lock:
+            self._profile_cache_generation += 1
+            if name_changed:
+                self._profile_cache.pop("namechange", None)
+            if isinstance(data, dict) and "id" in data and "skins" in data:
+                self._profile_cache["profile"] = data
+            else:
+                self._profile_cache.pop("profile", None)
+
+    def _mutate(
+        self, method: str, url: str, name_changed: bool = False, **kwargs: Any
+    ) -> requests.Response:
+        """Makes a request that changes the profile, and updates the profile cache with the result"""
+        try:
+            resp = self.request(method, url, **kwargs)
+        except Exception:
+            # The change may or may not have been applied
+            self.invalidate_profile_cache()
+            raise
+
+        if resp.ok:
+            self._store_profile(resp, name_changed)
+        return resp
+
     def _validate_session(self) -> None:
         resp = self.request(
             "get", f"{_BASE_API_URL}/entitlements/mcstore", ignore_codes=[401]
@@ -87,7 +327,7 @@ class MojangAuth(_HTTPClient):
         if resp.status_code == 401:
             raise MissingMinecraftLicense
 
-        data = resp.json()
+        data = self._json(resp)
 
         if not bool(data["items"]):
             raise MissingMinecraftLicense
@@ -107,7 +347,10 @@ class MojangAuth(_HTTPClient):
         }
 
         resp = self.request(
-            "get", "https://login.live.com/oauth20_authorize.srf", params=params
+            "get",
+            "https://login.live.com/oauth20_authorize.srf",
+            params=params,
+            headers=_WITHOUT_AUTHORIZATION,
         )
 
         # Parses the values via regex since the HTML can't be parsed
@@ -125,7 +368,7 @@ class MojangAuth(_HTTPClient):
             "PPFT": token,
         }
 
-        resp = self.request("post", url, data=payload)
+        resp = self.request("post", url, data=payload, headers=_WITHOUT_AUTHORIZATION)
         if "access_token" not in resp.url:
             raise LoginFailure
 
@@ -150,11 +393,15 @@ class MojangAuth(_HTTPClient):
         }
 
         resp = self.request(
-            "post", "https://user.auth.xboxlive.com/user/authenticate", json=json_data
+            "post",
+            "https://user.auth.xboxlive.com/user/authenticate",
+            json=json_data,
+            headers=_WITHOUT_AUTHORIZATION,
         )
 
-        xbl_token = resp.json()["Token"]
-        user_hash = resp.json()["DisplayClaims"]["xui"][0]["uhs"]
+        data = self._json(resp)
+        xbl_token = data["Token"]
+        user_hash = data["DisplayClaims"]["xui"][0]["uhs"]
 
         return xbl_token, user_hash
 
@@ -171,16 +418,18 @@ class MojangAuth(_HTTPClient):
             "https://xsts.auth.xboxlive.com/xsts/authorize",
             ignore_codes=[401],
             json=json_data,
+            headers=_WITHOUT_AUTHORIZATION,
         )
 
+        data = self._json(resp)
+
         if resp.status_code == 401:
-            data = resp.json()
             if data.get("XErr"):
                 if data["XErr"] in self._XERRORS:
                     raise LoginFailure(data["XErr"])
             raise MojangError(response=resp)
 
-        return resp.json()["Token"]
+        return data["Token"]
 
     def _authenticate_with_minecraft(self, user_hash, xsts_token):
         json_payload = {
@@ -192,9 +441,10 @@ class MojangAuth(_HTTPClient):
             "post",
             f"{_BASE_API_URL}/authentication/login_with_xbox",
             json=json_payload,
+            headers=_WITHOUT_AUTHORIZATION,
         )
 
-        return resp.json()
+        return self._json(resp)
 
     def _login(self):
         token, url = self._get_oauth2_token_and_url()
@@ -208,14 +458,35 @@ class MojangAuth(_HTTPClient):
         self._set_authorization_header(self.bearer_token)
 
 
+def _background_refresh(ref: "weakref.ref[MojangAuth]") -> None:
+    auth = ref()
+    if auth is None:
+        return
+
+    try:
+        auth.refresh_bearer_token()
+    except Exception:  # pylint: disable=broad-except
+        _log.exception("Background bearer token refresh failed. Retrying in 60 seconds.")
+        auth._schedule_refresh(60)
+
+
 class Client(MojangAuth):
-    def get_profile(self) -> Profile:
+    @_with_deadline
+    def get_profile(
+        self,
+        *,
+        deadline: Optional[float] = None,
+    ) -> Profile:
         """Get information about the current profile.
 
+        Args:
+            deadline (optional): The maximum number of seconds this call may take, including any retries.
+                `DeadlineExceeded` is raised once it has passed.
+
         Returns:
             A `Profile` object that contains information about a Minecraft profile
         """
-        data = self.request("get", f"{_BASE_API_URL}/minecraft/profile").json()
+        data = self._get_cached("profile", f"{_BASE_API_URL}/minecraft/profile")
 
         capes = []
         skins = []
@@ -248,17 +519,26 @@ class Client(MojangAuth):
             skins=skins,
         )
 
-    def get_name_change_info(self) -> Dict[str, Any]:
+    @_with_deadline
+    def get_name_change_info(
+        self,
+        *,
+        deadline: Optional[float] = None,
+    ) -> Dict[str, Any]:
         """Check if the account's username can be changed.
 
+        Args:
+            deadline (optional): The maximum number of seconds this call may take, including any retries.
+                `DeadlineExceeded` is raised once it has passed.
+
         Returns:
             A dictionary object that contains information about the account's username. \
                 Possible keys are `changed_at`, `created_at`, \
                 and `name_change_allowed`.
         """
-        data = self.request(
-            "get", f"{_BASE_API_URL}/minecraft/profile/namechange"
-        ).json()
+        data = self._get_cached(
+            "namechange", f"{_BASE_API_URL}/minecraft/profile/namechange"
+        )
 
         return NameInformation(
             changed_at=data.get("changedAt"),
@@ -266,9 +546,19 @@ class Client(MojangAuth):
             name_change_allowed=data.get("nameChangeAllowed"),
         )
 
-    def get_billing_info(self) -> List[Dict[str, Any]]:
-        """Get general billing info and credit card information stored on the account."""
-        return self.request("get", f"{_BASE_API_URL}/creditcards").json()
+    @_with_deadline
+    def get_billing_info(
+        self,
+        *,
+        deadline: Optional[float] = None,
+    ) -> List[Dict[str, Any]]:
+        """Get general billing info and credit card information stored on the account.
+
+        Args:
+            deadline (optional): The maximum number of seconds this call may take, including any retries.
+                `DeadlineExceeded` is raised once it has passed.
+        """
+        return self._json(self.request("get", f"{_BASE_API_URL}/creditcards"))
 
     def _get_username_status(self, username: str):
         """Check a username's status
@@ -289,9 +579,15 @@ class Client(MojangAuth):
             "get", f"{_BASE_API_URL}/minecraft/profile/name/{username}/available"
         )
 
-        return resp.json()["status"]
+        return self._json(resp)["status"]
 
-    def is_username_available(self, username: str) -> bool:
+    @_with_deadline
+    def is_username_available(
+        self,
+        username: str,
+        *,
+        deadline: Optional[float] = None,
+    ) -> bool:
         """Check if a username is available.
 
         Warning: Limitations
@@ -301,13 +597,21 @@ class Client(MojangAuth):
 
         Args:
             username: The Minecraft username to check.
+            deadline (optional): The maximum number of seconds this call may take, including any retries.
+                `DeadlineExceeded` is raised once it has passed.
 
         Returns:
             `True` if the username is available; `False` if the username is invalid or already taken
         """
         return self._get_username_status(username) == "AVAILABLE"
 
-    def is_username_blocked(self, username: str) -> bool:
+    @_with_deadline
+    def is_username_blocked(
+        self,
+        username: str,
+        *,
+        deadline: Optional[float] = None,
+    ) -> bool:
         """
         Check if a username is blocked by Mojang's username filter.
 
@@ -320,13 +624,21 @@ class Client(MojangAuth):
 
         Args:
             username: The Minecraft username to check.
+            deadline (optional): The maximum number of seconds this call may take, including any retries.
+                `DeadlineExceeded` is raised once it has passed.
 
         Returns:
             `True` if the username is blocked; `False` if the username is not blocked
         """
         return self._get_username_status(username) == "NOT_ALLOWED"
 
-    def change_username(self, username: str) -> Dict[str, Any]:
+    @_with_deadline
+    def change_username(
+        self,
+        username: str,
+        *,
+        deadline: Optional[float] = None,
+    ) -> Dict[str, Any]:
         """Change the profile's Minecraft username.
 
         Warning: Limitations
@@ -335,6 +647,8 @@ class Client(MojangAuth):
 
         Args:
             username:  The username you want to change to.
+            deadline (optional): The maximum number of seconds this call may take, including any retries.
+                `DeadlineExceeded` is raised once it has passed.
 
         Returns:
             A dictionary object that contains information about whether the username was claimed. \
@@ -343,9 +657,10 @@ class Client(MojangAuth):
         """
         _assert_valid_username(username)
 
-        resp = self.request(
+        resp = self._mutate(
             "put",
             f"{_BASE_API_URL}/minecraft/profile/name/{username}",
+            name_changed=True,
             ignore_codes=[400, 403],
         )
 
@@ -354,10 +669,10 @@ class Client(MojangAuth):
 
         if resp.status_code == 400:
             try:
-                error = resp.json()["errorMessage"].replace(
+                error = self._json(resp)["errorMessage"].replace(
                     "changeProfileName.profileName:", ""
                 )
-            except (requests.JSONDecodeError, KeyError) as exc:
+            except (ValueError, KeyError) as exc:
                 raise BadRequest(response=resp) from exc
 
             return dict(success=False, error=error)
@@ -371,11 +686,14 @@ class Client(MojangAuth):
 
         raise MojangError(response=resp)
 
+    @_with_deadline
     def change_skin(
         self,
         variant: Optional[str] = "classic",
         url: Optional[str] = None,
         image_path: Optional[str] = None,
+        *,
+        deadline: Optional[float] = None,
     ) -> None:
         """Set a new skin for your profile.
 
@@ -387,6 +705,8 @@ class Client(MojangAuth):
             variant: Set "slim" for the slim model, or "classic" for the default.
             url: A direct image URL to the skin you want to change to.
             image_path: The file name or full file path to the skin image file.
+            deadline (optional): The maximum number of seconds this call may take, including any retries.
+                `DeadlineExceeded` is raised once it has passed.
 
         Raises:
             MojangError: If the skin could not be changed for some reason.
@@ -403,7 +723,7 @@ class Client(MojangAuth):
 
         if url:
             json_payload = {"url": url, "variant": variant}
-            self.request(
+            self._mutate(
                 "post", f"{_BASE_API_URL}/minecraft/profile/skins", json=json_payload
             )
         else:
@@ -411,14 +731,17 @@ class Client(MojangAuth):
                 "file": open(f"{image_path}", "rb"),
                 "variant": (None, variant),
             }
-            self.request(
+            self._mutate(
                 "post", f"{_BASE_API_URL}/minecraft/profile/skins", files=files
             )
 
+    @_with_deadline
     def copy_skin(
         self,
         username: Optional[str] = None,
-        uuid: Optional[str] = None,
+        uuid: Optional[Union[str, PlayerUUID]] = None,
+        *,
+        deadline: Optional[float] = None,
     ) -> None:
         """Copy another player's Minecraft skin and skin variant. This will set their skin on your account.
 
@@ -426,7 +749,9 @@ class Client(MojangAuth):
 
         Args:
             username: The username of the player whose skin you want to copy.
-            uuid: The UUID of the player whose skin you want to copy.
+            uuid: The UUID of the player whose skin you want to copy. Dashed and undashed UUIDs are both accepted.
+            deadline (optional): The maximum number of seconds this call may take, including any retries.
+                `DeadlineExceeded` is raised once it has passed.
 
         Raises:
             ValueError: If an invalid username or UUID is supplied.
@@ -439,21 +764,21 @@ class Client(MojangAuth):
                 "get", f"https://api.mojang.com/users/profiles/minecraft/{username}"
             )
             try:
-                uuid = resp.json()["id"]
-            except requests.JSONDecodeError as exc:
+                uuid = self._json(resp)["id"]
+            except ValueError as exc:
                 raise ValueError("Username does not exist") from exc
 
         resp = self.request(
             "get",
-            f"https://sessionserver.mojang.com/session/minecraft/profile/{uuid}",
+            f"https://sessionserver.mojang.com/session/minecraft/profile/{_normalize_uuid(uuid)}",
             ignore_codes=[400],
         )
 
         try:
-            value = resp.json()["properties"][0]["value"]
-        except (KeyError, requests.JSONDecodeError) as exc:
+            value = self._json(resp)["properties"][0]["value"]
+        except (KeyError, ValueError) as exc:
             raise MojangError("Invalid UUID supplied") from exc
-        data = ast.literal_eval(base64.b64decode(value).decode())
+        data = self.json_loads(base64.b64decode(value))
 
         skin_url = None
         skin_variant = "classic"
@@ -471,19 +796,47 @@ class Client(MojangAuth):
                 variant=skin_variant,
             )
 
-    def change_skin_variant(self, variant: str) -> None:
+    @_with_deadline
+    def change_skin_variant(
+        self,
+        variant: str,
+        *,
+        deadline: Optional[float] = None,
+    ) -> None:
         """Change the skin variant for your current Minecraft skin.
 
         Args:
             variant: Set "slim" for the slim model, or "classic" for the default.
+            deadline (optional): The maximum number of seconds this call may take, including any retries.
+                `DeadlineExceeded` is raised once it has passed.
         """
         profile = self.get_profile()
         self.change_skin(url=profile.skins[0].url, variant=variant)
 
-    def reset_skin(self) -> None:
-        """Reset the profile's Minecraft skin to the default one"""
-        self.request("delete", f"{_BASE_API_URL}/minecraft/profile/skins/active")
+    @_with_deadline
+    def reset_skin(
+        self,
+        *,
+        deadline: Optional[float] = None,
+    ) -> None:
+        """Reset the profile's Minecraft skin to the default one
+
+        Args:
+            deadline (optional): The maximum number of seconds this call may take, including any retries.
+                `DeadlineExceeded` is raised once it has passed.
+        """
+        self._mutate("delete", f"{_BASE_API_URL}/minecraft/profile/skins/active")
 
-    def disable_cape(self) -> None:
-        """Disable the profile's cape so it is no longer shown"""
-        self.request("delete", f"{_BASE_API_URL}/minecraft/profile/capes/active")
+    @_with_deadline
+    def disable_cape(
+        self,
+        *,
+        deadline: Optional[float] = None,
+    ) -> None:
+        """Disable the profile's cape so it is no longer shown
+
+        Args:
+            deadline (optional): The maximum number of seconds this call may take, including any retries.
+                `DeadlineExceeded` is raised once it has passed.
+        """
+        self._mutate("delete", f"{_BASE_API_URL}/minecraft/profile/capes/active")
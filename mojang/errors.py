@@ -2,6 +2,8 @@ from typing import Optional
 
 import requests
 
+from mojang._utils import _decode_json
+
 
 class MojangError(Exception):
     """Base error class for all library-related exceptions in this file.
@@ -13,11 +15,11 @@ class MojangError(Exception):
         message: Optional[str] = None,
         response: Optional[requests.Response] = None,
     ):
-        if response:
+        if response is not None:
             try:
-                data = response.json()
+                data = _decode_json(response)
                 message = f"[HTTP {response.status_code}] - [{data['errorMessage']}]"
-            except (KeyError, requests.JSONDecodeError):
+            except (KeyError, TypeError, ValueError):
                 message = f"[HTTP {response.status_code}] - {response.url}\n\n"
         else:
             if message:
@@ -64,3 +66,7 @@ class MissingMinecraftLicense(MojangError):
 
 class MissingMinecraftProfile(MojangError):
     """The account has a Minecraft license, but it hasn't created a profile yet."""
+
+
+class DeadlineExceeded(MojangError):
+    """The call did not complete within its deadline or time budget."""
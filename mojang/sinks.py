@@ -0,0 +1,311 @@
+"""Output sinks that bulk results can be streamed into as they arrive.
+
+Records are buffered and written in batches of `batch_size`, so memory use stays flat no matter how many
+records are written. A record can be a dictionary, a dataclass (such as `UserProfile`) or a tuple, in
+which case `fields` must be supplied. `PlayerUUID` values are written in their undashed form.
+
+The `fsync` argument controls when data is forced to disk: `"never"`, after every `"batch"`, or on `"close"`.
+"""
+import csv
+import dataclasses
+import json
+import os
+import sqlite3
+from typing import Any, Dict, Iterable, List, Optional, Sequence, TextIO, Union
+
+from mojang._types import PlayerUUID
+
+_FSYNC_MODES = ("never", "batch", "close")
+
+
+def _to_row(record: Any, fields: Optional[Sequence[str]]) -> Dict[str, Any]:
+    if dataclasses.is_dataclass(record):
+        row = dataclasses.asdict(record)
+    elif isinstance(record, dict):
+        row = record
+    elif isinstance(record, (tuple, list)):
+        if fields is None:
+            raise TypeError("The fields argument is required to write tuples.")
+        row = dict(zip(fields, record))
+    else:
+        raise TypeError(f"Cannot write a record of type {record.__class__.__name__}")
+
+    return {
+        key: str(value) if isinstance(value, PlayerUUID) else value
+        for key, value in row.items()
+    }
+
+
+class Sink:
+    """Base class of all sinks. Sinks can be used as context managers, which closes them on exit."""
+
+    def __init__(
+        self,
+        fields: Optional[Sequence[str]] = None,
+        batch_size: Optional[int] = 1000,
+        fsync: Optional[str] = "close",
+    ):
+        if fsync not in _FSYNC_MODES:
+            raise ValueError(f"fsync must be one of {', '.join(_FSYNC_MODES)}.")
+        if batch_size < 1:
+            raise ValueError("The batch size must be at least 1.")
+
+        self.fields = list(fields) if fields else None
+        self.batch_size = batch_size
+        self.fsync = fsync
+        self.count = 0
+        self._buffer: List[Dict[str, Any]] = []
+        self._closed = False
+
+    def write(self, record: Any) -> None:
+        """Adds a record, writing out the buffered batch once it is full"""
+        row = _to_row(record, self.fields)
+        if self.fields is None:
+            self.fields = list(row)
+
+        self._buffer.append(row)
+        self.count += 1
+
+        if len(self._buffer) >= self.batch_size:
+            self.flush()
+
+    def write_many(self, records: Iterable[Any]) -> int:
+        """Consumes an iterable of records, such as the results of `API.iter_profiles`.
+
+        Returns:
+            The number of records written.
+        """
+        start = self.count
+        for record in records:
+            self.write(record)
+        return self.count - start
+
+    def flush(self) -> None:
+        """Writes out the buffered records"""
+        if self._buffer:
+            self._write_batch(self._buffer)
+            self._buffer = []
+            if self.fsync == "batch":
+                self._sync()
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self.flush()
+        if self.fsync != "never":
+            self._sync()
+        self._close()
+        self._closed = True
+
+    def _write_batch(self, rows: List[Dict[str, Any]]) -> None:
+        raise NotImplementedError
+
+    def _sync(self) -> None:
+        raise NotImplementedError
+
+    def _close(self) -> None:
+        raise NotImplementedError
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class _FileSink(Sink):
+    def __init__(self, path: Union[str, TextIO], mode: str, **kwargs: Any):
+        super().__init__(**kwargs)
+        self.path = path
+        # An already open file, such as stdout, is left open and isn't synced
+        self._owns_file = isinstance(path, str)
+        if self._owns_file:
+            self._file = open(path, mode, encoding="utf-8", newline="")
+        else:
+            self._file = path
+
+    def _sync(self) -> None:
+        self._file.flush()
+        if self._owns_file:
+            os.fsync(self._file.fileno())
+
+    def _close(self) -> None:
+        if self._owns_file:
+            self._file.close()
+        else:
+            self._file.flush()
+
+
+class NDJSONSink(_FileSink):
+    """Writes one JSON object per line.
+
+    Args:
+        path: The output file, or an open text file such as `sys.stdout`.
+        append (optional): Append to the file instead of overwriting it.
+    """
+
+    def __init__(self, path: Union[str, TextIO], append: Optional[bool] = False, **kwargs: Any):
+        super().__init__(path, "a" if append else "w", **kwargs)
+
+    def _write_batch(self, rows: List[Dict[str, Any]]) -> None:
+        self._file.write(
+            "".join(json.dumps(row, separators=(",", ":")) + "\n" for row in rows)
+        )
+        self._file.flush()
+
+
+class CSVSink(_FileSink):
+    """Writes a CSV file with a header row. The columns are `fields`, or the keys of the first record.
+
+    Args:
+        path: The output file, or an open text file such as `sys.stdout`.
+    """
+
+    def __init__(self, path: Union[str, TextIO], **kwargs: Any):
+        super().__init__(path, "w", **kwargs)
+        self._writer: Optional[csv.DictWriter] = None
+
+    def _write_batch(self, rows: List[Dict[str, Any]]) -> None:
+        if self._writer is None:
+            self._writer = csv.DictWriter(
+                self._file, fieldnames=self.fields, extrasaction="ignore"
+            )
+            self._writer.writeheader()
+        self._writer.writerows(rows)
+        self._file.flush()
+
+
+class SQLiteSink(Sink):
+    """Upserts records into a SQLite table, which is created if it doesn't exist yet.
+    Each batch is written in a single transaction.
+
+    With `fsync="close"`, the database is in WAL mode while the sink is open, and batches are only forced
+    to disk when it is closed. With `fsync="batch"`, every batch is forced to disk as it is committed.
+
+    Args:
+        path: The database file.
+        table (optional): The table name.
+        key (optional): The primary key column. Records with a key that already exists replace the old row.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        table: Optional[str] = "results",
+        key: Optional[str] = "id",
+        **kwargs: Any,
+    ):
+        super().__init__(**kwargs)
+        self.path = path
+        self.table = table
+        self.key = key
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        if self.fsync == "close":
+            # Commits in WAL mode with synchronous = NORMAL aren't synced, but a crash can't corrupt the database
+            self._connection.execute("PRAGMA journal_mode = WAL")
+            self._connection.execute("PRAGMA synchronous = NORMAL")
+        else:
+            self._connection.execute(
+                f"PRAGMA synchronous = {'OFF' if self.fsync == 'never' else 'FULL'}"
+            )
+        self._statement: Optional[str] = None
+
+    def _write_batch(self, rows: List[Dict[str, Any]]) -> None:
+        if self._statement is None:
+            columns = ", ".join(
+                f'"{field}"' + (" PRIMARY KEY" if field == self.key else "")
+                for field in self.fields
+            )
+            self._connection.execute(
+                f'CREATE TABLE IF NOT EXISTS "{self.table}" ({columns})'
+            )
+            names = ", ".join(f'"{field}"' for field in self.fields)
+            placeholders = ", ".join("?" for _ in self.fields)
+            self._statement = f'INSERT OR REPLACE INTO "{self.table}" ({names}) VALUES ({placeholders})'
+
+        with self._connection:
+            self._connection.executemany(
+                self._statement,
+                ([_sqlite_value(row.get(field)) for field in self.fields] for row in rows),
+            )
+
+    def _sync(self) -> None:
+        # With fsync="batch", every batch is already committed with synchronous = FULL
+        if self.fsync == "close":
+            # Leaving WAL mode checkpoints the log into the database file, which is synced with synchronous = FULL
+            self._connection.execute("PRAGMA synchronous = FULL")
+            self._connection.execute("PRAGMA journal_mode = DELETE")
+
+    def _close(self) -> None:
+        self._connection.close()
+
+
+def _sqlite_value(value: Any) -> Any:
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    return value
+
+
+class ParquetSink(Sink):
+    """Writes a columnar Apache Parquet file, one row group per batch.
+
+    Note:
+        This sink requires `pyarrow`, which can be installed with `pip install mojang[parquet]`.
+
+    The column types are taken from `schema`, or inferred from the first batch. Columns that are empty in
+    the first batch, such as `cape_url` when none of the first profiles has a cape, become nullable strings.
+
+    Args:
+        path: The output file.
+        schema (optional): A `pyarrow.Schema` with a field for every column.
+    """
+
+    def __init__(self, path: str, schema: Optional[Any] = None, **kwargs: Any):
+        try:
+            import pyarrow  # pylint: disable=import-outside-toplevel
+            import pyarrow.parquet  # pylint: disable=import-outside-toplevel
+        except ImportError as exc:
+            raise ImportError(
+                "ParquetSink requires pyarrow. Install it with: pip install mojang[parquet]"
+            ) from exc
+
+        super().__init__(**kwargs)
+        self.path = path
+        self.schema = schema
+        self._pyarrow = pyarrow
+        self._file = open(path, "wb")
+        self._writer = None
+
+    def _write_batch(self, rows: List[Dict[str, Any]]) -> None:
+        columns = {field: [row.get(field) for row in rows] for field in self.fields}
+        table = self._pyarrow.table(columns, schema=self.schema)
+
+        if self._writer is None:
+            schema = self.schema
+            if schema is None:
+                # A column of only nulls would be typed null, which later values can't be cast to
+                schema = self._pyarrow.schema(
+                    [
+                        field.with_type(self._pyarrow.string())
+                        if self._pyarrow.types.is_null(field.type)
+                        else field
+                        for field in table.schema
+                    ]
+                )
+            self._writer = self._pyarrow.parquet.ParquetWriter(self._file, schema)
+        self._writer.write_table(table.cast(self._writer.schema))
+
+    def _sync(self) -> None:
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self) -> None:
+        if not self._closed:
+            self.flush()
+            if self._writer is not None:
+                # Writes the Parquet footer, which has to happen before syncing
+                self._writer.close()
+        super().close()
+
+    def _close(self) -> None:
+        self._file.close()
@@ -0,0 +1,252 @@
+"""Batch validation, normalization and deduplication of usernames and UUIDs.
+
+Running a large input file through these functions before a bulk job drops everything Mojang would reject
+without spending any requests on it. Usernames must be 3 to 16 characters of `A-Z`, `a-z`, `0-9` and `_`,
+and are deduplicated case-insensitively, keeping the first spelling. UUIDs may be dashed or undashed and
+are normalized to the lowercase, undashed form.
+
+Note:
+    Whole batches are checked at once with array operations if `numpy` is installed, which can be done
+    with `pip install mojang[numpy]`. Otherwise, a slower pure-Python implementation is used.
+"""
+import itertools
+import re
+from typing import Any, Callable, Iterable, Iterator, List, Tuple
+
+from mojang._types import _HEX_UUID, PlayerUUID, ValidationResult
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+_MIN_USERNAME_LENGTH = 3
+_MAX_USERNAME_LENGTH = 16
+_USERNAME_PATTERN = re.compile(r"[A-Za-z0-9_]+")
+_DASH_POSITIONS = (8, 13, 18, 23)
+
+# Batches smaller than this are faster to check in pure Python
+_NUMPY_MIN_BATCH = 64
+# The number of items validated at once by `_validated`
+_BLOCK_SIZE = 65536
+
+if np is not None:
+    # The columns of a dashed UUID that hold hex digits
+    _DASHED_HEX_COLUMNS = np.array([i for i in range(36) if i not in _DASH_POSITIONS])
+
+
+def _prepare(items: Iterable[Any]) -> Tuple[List[str], List[Tuple[Any, str]]]:
+    """Strips surrounding whitespace, and rejects items that aren't strings or `PlayerUUID`s"""
+    strings = []
+    rejected = []
+    for item in items:
+        if isinstance(item, str):
+            strings.append(item.strip())
+        elif isinstance(item, PlayerUUID):
+            strings.append(item.hex)
+        else:
+            rejected.append((item, "type"))
+    return strings, rejected
+
+
+def _code_points(strings: List[str], width: int) -> Tuple[Any, Any]:
+    """Returns the characters of every string as a `(len(strings), width)` array of ASCII codes, padded with
+    zeros and truncated to `width`, along with the length of every string. Non-ASCII characters become 127."""
+    lengths = np.fromiter(map(len, strings), dtype=np.int64, count=len(strings))
+    codes = np.array(strings, dtype=f"<U{width}").view(np.uint32)
+    codes = np.minimum(codes, 127).astype(np.uint8)
+    return codes.reshape(len(strings), width), lengths
+
+
+def _between(codes: Any, low: str, high: str) -> Any:
+    # Codes below `low` wrap around to large values, so a single comparison checks both bounds
+    return (codes - np.uint8(ord(low))) <= ord(high) - ord(low)
+
+
+def _first_occurrences(keys: Any) -> Any:
+    """Returns the sorted indices of the first occurrence of every distinct row of 16-byte keys.
+
+    Comparing packed integers is much faster than comparing strings, which is what `np.unique` would do.
+    """
+    if not len(keys):
+        return np.empty(0, dtype=np.int64)
+
+    keys = np.ascontiguousarray(keys).view(np.uint64)
+    order = np.lexsort((keys[:, 1], keys[:, 0]))
+    ordered = keys[order]
+    first = np.empty(len(order), dtype=bool)
+    first[0] = True
+    first[1:] = (ordered[1:] != ordered[:-1]).any(axis=1)
+    # lexsort is stable, so the first row of every run of equal keys is the earliest occurrence
+    return np.sort(order[first])
+
+
+def _usernames_numpy(
+    names: List[str], dedupe: bool
+) -> Tuple[List[str], List[Tuple[Any, str]], int]:
+    codes, lengths = _code_points(names, _MAX_USERNAME_LENGTH + 1)
+    # Setting bit 5 lowercases A-Z
+    lowered = codes | np.uint8(0x20)
+
+    bad_length = (lengths < _MIN_USERNAME_LENGTH) | (lengths > _MAX_USERNAME_LENGTH)
+    allowed = (
+        _between(codes, "0", "9")
+        | _between(lowered, "a", "z")
+        | (codes == ord("_"))
+    )
+    # The padding is never allowed, so a name is valid if all of its characters are
+    bad_chars = allowed.sum(axis=1) != lengths
+
+    invalid = np.flatnonzero(bad_length | bad_chars)
+    rejected = [
+        (names[i], "length" if length else "characters")
+        for i, length in zip(invalid.tolist(), bad_length[invalid].tolist())
+    ]
+
+    valid = np.flatnonzero(~(bad_length | bad_chars))
+    duplicates = 0
+    if dedupe:
+        first = _first_occurrences(lowered[valid, :_MAX_USERNAME_LENGTH])
+        duplicates = len(valid) - len(first)
+        valid = valid[first]
+
+    return [names[i] for i in valid.tolist()], rejected, duplicates
+
+
+def _usernames_python(
+    names: List[str], dedupe: bool
+) -> Tuple[List[str], List[Tuple[Any, str]], int]:
+    accepted = []
+    rejected = []
+    seen = set()
+    duplicates = 0
+
+    for name in names:
+        if not _MIN_USERNAME_LENGTH <= len(name) <= _MAX_USERNAME_LENGTH:
+            rejected.append((name, "length"))
+        elif not _USERNAME_PATTERN.fullmatch(name):
+            rejected.append((name, "characters"))
+        elif dedupe and name.lower() in seen:
+            duplicates += 1
+        else:
+            seen.add(name.lower())
+            accepted.append(name)
+
+    return accepted, rejected, duplicates
+
+
+def _uuids_numpy(
+    uuids: List[str], dedupe: bool
+) -> Tuple[List[str], List[Tuple[Any, str]], int]:
+    codes, lengths = _code_points(uuids, 36)
+
+    dashed = (lengths == 36) & (codes[:, list(_DASH_POSITIONS)] == ord("-")).all(axis=1)
+    digits = codes[:, :32]
+    if dashed.any():
+        digits = digits.copy()
+        digits[dashed] = codes[dashed][:, _DASHED_HEX_COLUMNS]
+
+    lowered = digits | np.uint8(0x20)
+    is_hex = _between(digits, "0", "9") | _between(lowered, "a", "f")
+    valid = ((lengths == 32) | dashed) & is_hex.all(axis=1)
+
+    rejected = [(uuids[i], "format") for i in np.flatnonzero(~valid).tolist()]
+    lowered = lowered[valid]
+
+    duplicates = 0
+    if dedupe:
+        # Pack the 32 hex digits into 16 bytes
+        nibbles = np.where(lowered >= ord("a"), lowered - (ord("a") - 10), lowered - ord("0"))
+        first = _first_occurrences(nibbles[:, 0::2] << 4 | nibbles[:, 1::2])
+        duplicates = len(lowered) - len(first)
+        lowered = lowered[first]
+
+    normalized = lowered.astype(np.uint32).view("<U32").ravel()
+    return normalized.tolist(), rejected, duplicates
+
+
+def _uuids_python(
+    uuids: List[str], dedupe: bool
+) -> Tuple[List[str], List[Tuple[Any, str]], int]:
+    accepted = []
+    rejected = []
+    seen = set()
+    duplicates = 0
+
+    for uuid in uuids:
+        normalized = uuid
+        if len(uuid) == 36 and all(uuid[i] == "-" for i in _DASH_POSITIONS):
+            normalized = uuid.replace("-", "")
+
+        if not _HEX_UUID.fullmatch(normalized):
+            rejected.append((uuid, "format"))
+            continue
+
+        normalized = normalized.lower()
+        if dedupe and normalized in seen:
+            duplicates += 1
+        else:
+            seen.add(normalized)
+            accepted.append(normalized)
+
+    return accepted, rejected, duplicates
+
+
+def validate_usernames(names: Iterable[Any], dedupe: bool = True) -> ValidationResult:
+    """Checks the length and characters of every username, and drops duplicates.
+
+    Args:
+        names: The usernames. Surrounding whitespace is ignored.
+        dedupe (optional): Drop names that were already seen, ignoring case.
+
+    Returns:
+        The accepted names with their original spelling, and the rejected ones with the reason.
+    """
+    strings, rejected = _prepare(names)
+    check = _usernames_python
+    if np is not None and len(strings) >= _NUMPY_MIN_BATCH:
+        check = _usernames_numpy
+
+    accepted, invalid, duplicates = check(strings, dedupe)
+    return ValidationResult(accepted, rejected + invalid, duplicates)
+
+
+def validate_uuids(uuids: Iterable[Any], dedupe: bool = True) -> ValidationResult:
+    """Checks the format of every UUID, normalizes it to its lowercase undashed form, and drops duplicates.
+
+    Args:
+        uuids: The UUIDs, dashed or undashed. `PlayerUUID` objects are accepted as well.
+        dedupe (optional): Drop UUIDs that were already seen.
+
+    Returns:
+        The accepted, normalized UUIDs, and the rejected ones with the reason.
+    """
+    strings, rejected = _prepare(uuids)
+    check = _uuids_python
+    if np is not None and len(strings) >= _NUMPY_MIN_BATCH:
+        check = _uuids_numpy
+
+    accepted, invalid, duplicates = check(strings, dedupe)
+    return ValidationResult(accepted, rejected + invalid, duplicates)
+
+
+def _validated(
+    items: Iterable[Any],
+    validate: Callable[[Iterable[Any]], ValidationResult],
+    key: Callable[[str], str],
+    on_reject: Callable[[Any, str], None],
+) -> Iterator[str]:
+    """Validates a stream of items one block at a time, deduplicating across blocks as well"""
+    items = iter(items)
+    seen = set()
+
+    for block in iter(lambda: list(itertools.islice(items, _BLOCK_SIZE)), []):
+        result = validate(block)
+        for item, reason in result.rejected:
+            on_reject(item, reason)
+
+        for item in result.accepted:
+            item_key = key(item)
+            if item_key not in seen:
+                seen.add(item_key)
+                yield item
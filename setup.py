@@ -15,6 +15,8 @@ setuptools.setup(
     url="https://github.com/summer/mojang",
     packages=setuptools.find_packages(),
     install_requires=required_modules,
+    extras_require={"parquet": ["pyarrow>=7.0.0"], "numpy": ["numpy>=1.17"]},
+    entry_points={"console_scripts": ["mojang=mojang.cli:main"]},
     license="MIT",
     keywords=["mojang", "minecraft", "api", "mojang api", "minecraft api"],
     classifiers=[
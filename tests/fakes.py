@@ -0,0 +1,53 @@
+"""Offline stand-ins for Mojang's servers, used by the tests that do not need network access"""
+import json
+from typing import Any, Callable, Dict, Tuple
+
+import requests
+from requests.adapters import BaseAdapter
+
+
+Handler = Callable[[requests.PreparedRequest], Tuple[int, Any]]
+
+
+class FakeAdapter(BaseAdapter):
+    """Serves canned responses. `routes` maps (method, url prefix) to a handler or a (status, body) pair."""
+
+    def __init__(self, routes: Dict[Tuple[str, str], Any]):
+        super().__init__()
+        self.routes = routes
+        self.calls = []
+        self.timeouts = []
+
+    def send(self, request, **kwargs):
+        self.calls.append(request)
+        self.timeouts.append(kwargs.get("timeout"))
+        for (method, prefix), route in self.routes.items():
+            if request.method == method and request.url.startswith(prefix):
+                status, body = route(request) if callable(route) else route
+                break
+        else:
+            status, body = 404, {"errorMessage": "Not Found"}
+
+        resp = requests.Response()
+        resp.status_code = status
+        resp.url = request.url
+        resp.request = request
+        if isinstance(body, bytes):
+            resp._content = body
+        elif isinstance(body, str):
+            resp._content = body.encode()
+        else:
+            resp._content = json.dumps(body).encode()
+        return resp
+
+    def close(self):
+        pass
+
+
+def fake_session(routes: Dict[Tuple[str, str], Any]) -> requests.Session:
+    session = requests.Session()
+    adapter = FakeAdapter(routes)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.adapter = adapter
+    return session
@@ -0,0 +1,135 @@
+import base64
+import json
+import time
+import unittest
+
+from mojang import Client, MojangError
+from mojang._utils import _get_token_expiry
+
+from fakes import fake_session
+
+
+def _jwt(exp):
+    payload = base64.urlsafe_b64encode(json.dumps({"exp": exp}).encode()).decode()
+    return f"header.{payload.rstrip('=')}.signature"
+
+
+OLD_TOKEN = _jwt(int(time.time()) + 3600)
+NEW_TOKEN = _jwt(int(time.time()) + 7200)
+
+
+def _routes(accepted=(NEW_TOKEN,)):
+    def profile(request):
+        if request.headers["Authorization"].split(" ")[-1] not in accepted:
+            return 401, ""
+        return 200, {"id": "abc", "name": "Test", "skins": [], "capes": []}
+
+    def refresh(request):
+        body = json.loads(request.body)
+        assert body["accessToken"] == OLD_TOKEN
+        return 200, {
+            "accessToken": NEW_TOKEN,
+            "clientToken": "client",
+            "user": {"username": "test", "id": "abc"},
+        }
+
+    return {
+        ("GET", "https://api.minecraftservices.com/entitlements/mcstore"): (
+            200,
+            {"items": [{"name": "game_minecraft"}]},
+        ),
+        ("GET", "https://api.minecraftservices.com/minecraft/profile"): profile,
+        ("POST", "https://authserver.mojang.com/refresh"): refresh,
+    }
+
+
+def _login_routes(minecraft_login):
+    """The Microsoft and Xbox Live login flow, ending in `minecraft_login`"""
+    return {
+        ("GET", "https://login.live.com/oauth20_authorize.srf"): (
+            200,
+            "value=\"ppft\" urlPost:'https://login.live.com/ppsecure/post.srf"
+            "#access_token=a&refresh_token=b'",
+        ),
+        ("POST", "https://login.live.com/ppsecure/post.srf"): (200, ""),
+        ("POST", "https://user.auth.xboxlive.com/"): (
+            200,
+            {"Token": "xbl", "DisplayClaims": {"xui": [{"uhs": "hash"}]}},
+        ),
+        ("POST", "https://xsts.auth.xboxlive.com/"): (200, {"Token": "xsts"}),
+        ("POST", "https://api.minecraftservices.com/authentication/login_with_xbox"): minecraft_login,
+    }
+
+
+class TestAuth(unittest.TestCase):
+    """Tests the bearer token refresh without network access"""
+
+    def test_get_token_expiry(self):
+        self.assertEqual(_get_token_expiry(f"Bearer {_jwt(123)}"), 123)
+        self.assertIsNone(_get_token_expiry("not-a-jwt"))
+
+    def test_refresh_on_unauthorized(self):
+        session = fake_session(_routes())
+        client = Client(bearer_token=OLD_TOKEN, client_token="client", session=session)
+
+        self.assertEqual(client.bearer_token, NEW_TOKEN)
+        self.assertEqual(client.get_profile().name, "Test")
+        refreshes = [c for c in session.adapter.calls if c.url.endswith("/refresh")]
+        self.assertEqual(len(refreshes), 1)
+
+    def test_failed_login_not_retried(self):
+        session = fake_session(_login_routes((401, "")))
+
+        with self.assertRaises(MojangError):
+            Client("test@example.com", "password", session=session)
+
+        # The password is only submitted once
+        logins = [c for c in session.adapter.calls if "ppsecure" in c.url]
+        self.assertEqual(len(logins), 1)
+
+    def test_login_refresh_keeps_old_token(self):
+        seen = []
+        result = [(401, "")]
+
+        def minecraft_login(request):
+            # Other threads still send the old token while the login is in progress
+            seen.append((session.headers.get("Authorization"), request.headers.get("Authorization")))
+            return result[0]
+
+        routes = {**_routes(accepted=(OLD_TOKEN, NEW_TOKEN)), **_login_routes(minecraft_login)}
+        session = fake_session(routes)
+        client = Client("test@example.com", "password", bearer_token=OLD_TOKEN, session=session)
+
+        self.assertRaises(MojangError, client.refresh_bearer_token)
+        self.assertEqual(session.headers["Authorization"], f"Bearer {OLD_TOKEN}")
+
+        result[0] = (200, {"access_token": NEW_TOKEN})
+        client.refresh_bearer_token()
+
+        self.assertEqual(seen, [(f"Bearer {OLD_TOKEN}", None)] * 2)
+        self.assertEqual(session.headers["Authorization"], f"Bearer {NEW_TOKEN}")
+
+    def test_background_refresh(self):
+        session = fake_session(_routes(accepted=(OLD_TOKEN, NEW_TOKEN)))
+        client = Client(
+            bearer_token=OLD_TOKEN,
+            client_token="client",
+            session=session,
+            auto_refresh=True,
+            refresh_margin=3600,
+        )
+
+        # The next refresh is scheduled an hour before the new token expires
+        for _ in range(100):
+            timer = client._refresh_timer
+            if client.bearer_token == NEW_TOKEN and timer.interval > 0:
+                break
+            time.sleep(0.01)
+
+        self.assertEqual(client.bearer_token, NEW_TOKEN)
+        self.assertGreater(timer.interval, 3000)
+        timer.cancel()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+import hashlib
+import json
+import os
+import tempfile
+import unittest
+
+from mojang import API
+from mojang.cli import _blocked_patterns, _parser, run
+
+from fakes import fake_session
+
+
+class TestCLI(unittest.TestCase):
+    """Tests the command-line interface without network access"""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def _write(self, name, lines):
+        path = os.path.join(self.directory, name)
+        with open(path, "w") as f:
+            f.write("\n".join(lines) + "\n")
+        return path
+
+    def _run(self, routes, *argv):
+        output = os.path.join(self.directory, "out.ndjson")
+        api = API(session=fake_session(routes))
+        code = run(_parser().parse_args([*argv, "-o", output, "-q"]), api)
+        with open(output) as f:
+            return code, [json.loads(line) for line in f]
+
+    def test_blocked_patterns(self):
+        self.assertEqual(
+            _blocked_patterns("Play.Example.com:25565"),
+            ["play.example.com", "*.example.com", "*.com"],
+        )
+        self.assertEqual(
+            _blocked_patterns("1.2.3.4"), ["1.2.3.4", "1.2.3.*", "1.2.*", "1.*"]
+        )
+
+    def test_blocked_servers(self):
+        blocked = hashlib.sha1(b"*.example.com").hexdigest()
+        hosts = self._write("hosts.txt", ["mc.example.com", "# comment", "", "ok.net"])
+
+        code, rows = self._run(
+            {("GET", "https://sessionserver.mojang.com/blockedservers"): (200, blocked)},
+            "blocked-servers",
+            hosts,
+        )
+
+        self.assertEqual(code, 0)
+        self.assertEqual(
+            rows,
+            [
+                {"host": "mc.example.com", "blocked": True, "pattern": "*.example.com"},
+                {"host": "ok.net", "blocked": False, "pattern": None},
+            ],
+        )
+
+    def test_uuids_counts_errors(self):
+        def lookup(request):
+            names = json.loads(request.body)
+            if "broken" in names:
+                return 500, ""
+            return 200, [{"name": name, "id": name * 2} for name in names if name != "nobody"]
+
+        names = self._write("names.txt", [f"name{i}" for i in range(9)] + ["nobody"])
+        broken = self._write("broken.txt", ["broken"])
+
+        code, rows = self._run(
+            {("POST", "https://api.mojang.com/profiles/minecraft"): lookup},
+            "uuids",
+            names,
+            broken,
+        )
+
+        # The failed chunk doesn't stop the others, but is reflected in the exit code
+        self.assertEqual(code, 1)
+        self.assertEqual(len(rows), 9)
+        self.assertIn({"name": "name0", "id": "name0name0"}, rows)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+import threading
+import time
+import unittest
+
+from mojang import API, TooManyRequests
+from mojang._bulk import _map_unordered
+from mojang._concurrency import AdaptiveLimiter
+
+
+class TestAdaptiveLimiter(unittest.TestCase):
+    """Tests the adaptive concurrency limit used by bulk operations"""
+
+    def test_increase_and_backoff(self):
+        limiter = AdaptiveLimiter(initial=2, max_limit=8)
+        for _ in range(20):
+            limiter.record(0.1)
+        self.assertGreater(limiter.limit, 4)
+
+        before = limiter.limit
+        limiter.record(0.1, overloaded=True)
+        self.assertEqual(limiter.limit, before // 2)
+        # Decreases are ignored until a full window of requests has completed
+        limiter.record(0.1, overloaded=True)
+        self.assertEqual(limiter.limit, before // 2)
+        self.assertEqual(limiter.metrics.snapshot()["concurrency_decreases"], 1)
+
+    def test_backoff_on_rising_latency(self):
+        limiter = AdaptiveLimiter(initial=4, max_limit=4)
+        for _ in range(10):
+            limiter.record(0.1)
+        for _ in range(5):
+            limiter.record(1.0)
+        self.assertLessEqual(limiter.limit, 2)
+
+    def test_map_unordered(self):
+        limiter = AdaptiveLimiter(initial=3, max_limit=3)
+        lock = threading.Lock()
+        state = {"in_flight": 0, "peak": 0, "ratelimited": False}
+
+        def work(item):
+            with lock:
+                state["in_flight"] += 1
+                state["peak"] = max(state["peak"], state["in_flight"])
+            try:
+                time.sleep(0.01)
+                with lock:
+                    if item == 5 and not state["ratelimited"]:
+                        state["ratelimited"] = True
+                        raise TooManyRequests
+                return item * 2
+            finally:
+                with lock:
+                    state["in_flight"] -= 1
+
+        results = list(_map_unordered(work, range(20), limiter, max_sleep=0.01))
+
+        self.assertEqual(sorted(results), [i * 2 for i in range(20)])
+        self.assertLessEqual(state["peak"], 3)
+        self.assertEqual(limiter.in_flight, 0)
+
+    def test_client_metrics(self):
+        api = API(max_concurrency=4)
+        self.assertEqual(api.metrics.snapshot()["concurrency_limit"], api.concurrency.limit)
+
+
+if __name__ == "__main__":
+    unittest.main()
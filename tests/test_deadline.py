@@ -0,0 +1,86 @@
+import time
+import unittest
+
+from mojang import API, DeadlineExceeded, RequestScheduler
+from mojang._bulk import _map_unordered
+from mojang._concurrency import AdaptiveLimiter
+
+from config import NOTCH_UUID, NOTCH_USERNAME
+from fakes import fake_session
+
+
+def _session():
+    return fake_session(
+        {
+            ("GET", "https://api.mojang.com/"): (
+                200,
+                {"id": NOTCH_UUID, "name": NOTCH_USERNAME},
+            )
+        }
+    )
+
+
+class TestDeadlines(unittest.TestCase):
+    """Tests request timeouts, per-call deadlines and bulk time budgets"""
+
+    def test_timeouts(self):
+        session = _session()
+        api = API(session=session, timeout=(3, 20))
+
+        api.get_uuid(NOTCH_USERNAME)
+        api.get_uuid(NOTCH_USERNAME, deadline=5)
+
+        self.assertEqual(session.adapter.timeouts[0], (3, 20))
+        connect, read = session.adapter.timeouts[1]
+        self.assertEqual(connect, 3)
+        self.assertLessEqual(read, 5)
+
+    def test_deadline_while_scheduled(self):
+        api = API(session=_session(), scheduler=RequestScheduler(rate=0.5, burst=1))
+        api.get_uuid(NOTCH_USERNAME)
+
+        start = time.monotonic()
+        self.assertRaises(DeadlineExceeded, api.get_uuid, NOTCH_USERNAME, deadline=0.05)
+        self.assertLess(time.monotonic() - start, 0.5)
+
+    def test_time_budget(self):
+        def work(item):
+            time.sleep(0.3 if item >= 4 else 0.01)
+            return item
+
+        limiter = AdaptiveLimiter(initial=4, max_limit=4)
+        start = time.monotonic()
+        results = list(_map_unordered(work, range(20), limiter, time_budget=0.15))
+
+        self.assertLess(time.monotonic() - start, 0.3)
+        self.assertEqual(sorted(results), [0, 1, 2, 3])
+
+    def test_time_budget_while_slots_are_taken(self):
+        limiter = AdaptiveLimiter(initial=1, max_limit=1)
+        # Another bulk operation holds the only slot
+        limiter.acquire()
+        start = time.monotonic()
+
+        results = list(_map_unordered(lambda item: item, range(5), limiter, time_budget=0.1))
+
+        self.assertLess(time.monotonic() - start, 0.3)
+        self.assertEqual(results, [])
+        self.assertFalse(limiter.acquire(timeout=0.01))
+
+    def test_item_deadline(self):
+        def work(item):
+            if item == 2:
+                raise DeadlineExceeded
+            return item
+
+        for time_budget in (None, 10):
+            limiter = AdaptiveLimiter(initial=4, max_limit=4)
+            results = list(_map_unordered(work, range(6), limiter, time_budget=time_budget))
+
+            # Only the item that ran out of its own deadline is skipped, and it is counted
+            self.assertEqual(sorted(results), [0, 1, 3, 4, 5])
+            self.assertEqual(limiter.metrics.snapshot()["deadline_exceeded"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+import threading
+import time
+import unittest
+from urllib.parse import parse_qs, urlsplit
+
+from mojang import API
+
+from fakes import fake_session
+from test_http_client import _profile_body
+
+
+class TestHasJoined(unittest.TestCase):
+    """Tests the login checks against the session server"""
+
+    def setUp(self):
+        self.release = threading.Event()
+        self.release.set()
+
+        def has_joined(request):
+            self.release.wait(5)
+            query = parse_qs(urlsplit(request.url).query)
+            if query["serverId"] != ["joined"]:
+                return 204, b""
+            return 200, _profile_body(name=query["username"][0])
+
+        self.api = API(
+            session=fake_session(
+                {("GET", "https://sessionserver.mojang.com/session/minecraft/hasJoined"): has_joined}
+            )
+        )
+        self.calls = self.api.session.adapter.calls
+
+    def test_has_joined(self):
+        profile = self.api.has_joined("Notch", "joined", ip="127.0.0.1")
+
+        self.assertEqual(profile.name, "Notch")
+        query = parse_qs(urlsplit(self.calls[0].url).query)
+        self.assertEqual(query["ip"], ["127.0.0.1"])
+
+    def test_not_joined(self):
+        self.assertIsNone(self.api.has_joined("Notch", "other"))
+
+    def test_duplicates_are_coalesced(self):
+        self.release.clear()
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(self.api.has_joined("Notch", "joined")))
+            for _ in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.2)
+        self.release.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(self.calls), 1)
+        self.assertEqual([profile.name for profile in results], ["Notch"] * 4)
+        self.assertEqual(self.api.metrics.snapshot()["coalesced_calls"], 3)
+
+    def test_has_joined_many(self):
+        joins = [(f"player{i}", "joined") for i in range(10)] + [("player0", "other", "127.0.0.1")]
+
+        results = dict(self.api.has_joined_many(joins))
+
+        self.assertEqual(len(results), 11)
+        self.assertEqual(results[("player3", "joined")].name, "player3")
+        self.assertIsNone(results[("player0", "other", "127.0.0.1")])
+        self.assertEqual(self.api.concurrency.in_flight, 0)
+
+        histogram = self.api.metrics.histogram("has_joined")
+        self.assertEqual(histogram.count, 11)
+        self.assertEqual(sum(histogram.counts), 11)
+        self.assertLessEqual(histogram.quantile(0.5), histogram.quantile(0.99))
+
+
+if __name__ == "__main__":
+    unittest.main()
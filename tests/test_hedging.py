@@ -0,0 +1,56 @@
+import threading
+import time
+import unittest
+
+from mojang import API, Hedging, RequestScheduler
+
+from fakes import fake_session
+
+
+class TestHedging(unittest.TestCase):
+    """Tests hedged requests against a fake server with one slow response"""
+
+    def setUp(self):
+        self.slow = threading.Event()
+
+        def lookup(request):
+            # Only the first request after the event is set is slow
+            if self.slow.is_set():
+                self.slow.clear()
+                time.sleep(0.5)
+            return 200, {"id": "abc", "name": "Test"}
+
+        self.session = fake_session(
+            {("GET", "https://api.mojang.com/users/profiles/minecraft/"): lookup}
+        )
+
+    def _api(self, **kwargs):
+        hedging = Hedging(min_samples=5, max_ratio=1, min_delay=0.02)
+        api = API(session=self.session, hedging=hedging, **kwargs)
+        for _ in range(10):
+            api.get_uuid("Test")
+        return api
+
+    def test_slow_request_is_hedged(self):
+        api = self._api()
+        self.slow.set()
+
+        start = time.monotonic()
+        self.assertEqual(api.get_uuid("Test"), "abc")
+        self.assertLess(time.monotonic() - start, 0.3)
+        self.assertEqual(api.metrics.snapshot()["hedges_won"], 1)
+
+    def test_hedges_need_spare_budget(self):
+        scheduler = RequestScheduler(rate=1, burst=20)
+        api = self._api(scheduler=scheduler)
+        # Use up the spare budget, only the share reserved for interactive requests is left
+        while scheduler.try_acquire("api.mojang.com"):
+            pass
+        self.slow.set()
+
+        self.assertEqual(api.get_uuid("Test"), "abc")
+        self.assertNotIn("hedges_sent", api.metrics.snapshot())
+
+
+if __name__ == "__main__":
+    unittest.main()
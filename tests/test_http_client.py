@@ -0,0 +1,224 @@
+import base64
+import json
+import os
+import tempfile
+import time
+import unittest
+
+from mojang import API, MojangError
+from mojang._replay import _read_records
+
+from config import NOTCH_UUID, NOTCH_USERNAME, NOTCH_SKIN_URL
+from fakes import fake_session
+
+
+def _profile_body(uuid=NOTCH_UUID, name=NOTCH_USERNAME):
+    textures = {
+        "timestamp": 1660000000000,
+        "profileId": uuid,
+        "profileName": name,
+        "textures": {"SKIN": {"url": NOTCH_SKIN_URL}},
+    }
+    value = base64.b64encode(json.dumps(textures).encode()).decode()
+    return {
+        "id": uuid,
+        "name": name,
+        "properties": [{"name": "textures", "value": value}],
+    }
+
+
+class CountingLoads:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, data):
+        self.calls += 1
+        return json.loads(data)
+
+
+class TestHTTPClient(unittest.TestCase):
+    """Tests the internal request handling without network access"""
+
+    def test_custom_json_codec(self):
+        loads = CountingLoads()
+        session = fake_session(
+            {
+                ("GET", "https://sessionserver.mojang.com/"): (200, _profile_body()),
+                ("POST", "https://api.mojang.com/"): (
+                    200,
+                    [{"id": NOTCH_UUID, "name": NOTCH_USERNAME}],
+                ),
+            }
+        )
+        api = API(session=session, json_loads=loads)
+
+        self.assertEqual(api.get_uuids([NOTCH_USERNAME]), {NOTCH_USERNAME: NOTCH_UUID})
+        self.assertEqual(loads.calls, 1)
+
+        profile = api.get_profile(NOTCH_UUID)
+        self.assertEqual(profile.name, NOTCH_USERNAME)
+        self.assertEqual(profile.skin_url, NOTCH_SKIN_URL)
+        # The response body and the textures property
+        self.assertEqual(loads.calls, 3)
+
+    def test_error_body_decoded_once(self):
+        loads = CountingLoads()
+        session = fake_session(
+            {("POST", "https://api.mojang.com/"): (400, {"errorMessage": "Invalid"})}
+        )
+        api = API(session=session, json_loads=loads)
+
+        with self.assertRaises(MojangError) as ctx:
+            api.get_uuids(["a" * 20])
+        self.assertIn("Invalid", str(ctx.exception))
+        self.assertEqual(loads.calls, 1)
+
+    def test_tracing(self):
+        spans = []
+        session = fake_session(
+            {("GET", "https://sessionserver.mojang.com/"): (200, _profile_body())}
+        )
+        session.headers["Authorization"] = "Bearer secret"
+        api = API(session=session, trace_sample_rate=1.0, trace_handler=spans.append)
+
+        api.get_profile(NOTCH_UUID)
+
+        request_span, parse_span = sorted(spans, key=lambda span: span.name, reverse=True)
+        self.assertEqual(request_span.status_code, 200)
+        self.assertIn("ttfb", request_span.phases)
+        self.assertEqual(request_span.headers["Authorization"], "<redacted>")
+        self.assertEqual(parse_span.parent_id, request_span.span_id)
+        self.assertEqual(parse_span.trace_id, request_span.trace_id)
+        self.assertIn("parse", parse_span.phases)
+
+    def test_ratelimit_retry_trace(self):
+        responses = [(429, ""), (200, _profile_body())]
+        session = fake_session(
+            {("GET", "https://sessionserver.mojang.com/"): lambda request: responses.pop(0)}
+        )
+        spans = []
+        api = API(
+            session=session,
+            retry_on_ratelimit=True,
+            ratelimit_sleep_time=0,
+            trace_sample_rate=1.0,
+            trace_handler=spans.append,
+        )
+
+        api.get_profile(NOTCH_UUID)
+
+        request_span = next(span for span in spans if span.name == "request")
+        retry_span = next(span for span in spans if span.name == "retry")
+        self.assertIn("ratelimit_wait", request_span.phases)
+        self.assertEqual(retry_span.trace_id, request_span.trace_id)
+        self.assertEqual(retry_span.parent_id, request_span.span_id)
+        self.assertEqual(retry_span.status_code, 200)
+
+    def test_tracing_disabled(self):
+        spans = []
+        session = fake_session(
+            {("GET", "https://sessionserver.mojang.com/"): (200, _profile_body())}
+        )
+        api = API(session=session, trace_handler=spans.append)
+
+        api.get_profile(NOTCH_UUID)
+        self.assertEqual(spans, [])
+
+    def test_record_and_replay(self):
+        session = fake_session(
+            {
+                ("GET", "https://sessionserver.mojang.com/"): (200, _profile_body()),
+                ("POST", "https://api.mojang.com/"): (
+                    200,
+                    [{"id": NOTCH_UUID, "name": NOTCH_USERNAME}],
+                ),
+            }
+        )
+        session.headers["Authorization"] = "Bearer secret"
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "traffic.jsonl.gz")
+            api = API(session=session, record_to=path)
+            api.get_uuids([NOTCH_USERNAME])
+            api.get_profile(NOTCH_UUID)
+
+            records = list(_read_records(path))
+            self.assertEqual(len(records), 3)
+            self.assertNotIn("secret", json.dumps(records))
+
+            replay = API(replay_from=path)
+            self.assertEqual(replay.get_uuids([NOTCH_USERNAME]), {NOTCH_USERNAME: NOTCH_UUID})
+            self.assertEqual(replay.get_profile(NOTCH_UUID).name, NOTCH_USERNAME)
+            # Requests that were never recorded can't be served
+            self.assertRaises(Exception, replay.get_profile, "0" * 32)
+
+            # A supplied session replays as well
+            replay = API(session=fake_session({}), replay_from=path)
+            self.assertEqual(replay.get_profile(NOTCH_UUID).name, NOTCH_USERNAME)
+            replay.session.get_adapter("https://api.mojang.com")._lock.acquire()
+            replay._after_fork()
+            self.assertEqual(replay.get_uuids([NOTCH_USERNAME]), {NOTCH_USERNAME: NOTCH_UUID})
+
+    def test_replay_realtime(self):
+        session = fake_session({("GET", "https://sessionserver.mojang.com/"): (200, _profile_body())})
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "traffic.jsonl.gz")
+            api = API(session=session, record_to=path)
+            api.get_profile(NOTCH_UUID)
+            time.sleep(0.3)
+            api.get_profile("0" * 32)
+
+            replay = API(replay_from=path, replay_realtime=True)
+            replay.get_profile(NOTCH_UUID)
+            start = time.monotonic()
+            replay.get_profile("0" * 32)
+            # The second request waits for its original offset from the first one
+            self.assertGreaterEqual(time.monotonic() - start, 0.25)
+
+    def test_recording_redacts_credentials(self):
+        session = fake_session(
+            {
+                ("POST", "https://login.live.com/"): lambda request: (
+                    200,
+                    {"access_token": "ms-secret", "refresh_token": "refresh-secret"},
+                ),
+                ("POST", "https://api.minecraftservices.com/"): (
+                    200,
+                    {"username": "x", "access_token": "bearer-secret"},
+                ),
+            }
+        )
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "traffic.jsonl.gz")
+            api = API(session=session, record_to=path)
+            api.request(
+                "post",
+                "https://login.live.com/ppsecure/post.srf",
+                data={"login": "a@b", "passwd": "hunter2", "PPFT": "ppft-secret"},
+            )
+            api.request(
+                "post",
+                "https://api.minecraftservices.com/authentication/login_with_xbox",
+                json={"identityToken": "XBL3.0 x=hash;xsts-secret"},
+            )
+
+            recording = json.dumps(list(_read_records(path)))
+            for secret in ("hunter2", "ppft-secret", "ms-secret", "refresh-secret", "xsts-secret"):
+                self.assertNotIn(secret, recording)
+            self.assertNotIn("bearer-secret", recording)
+            self.assertIn("login=a%40b", recording)
+
+            # The replayed requests are matched on the redacted bodies
+            replay = API(replay_from=path)
+            resp = replay.request(
+                "post",
+                "https://login.live.com/ppsecure/post.srf",
+                data={"login": "a@b", "passwd": "other", "PPFT": "other"},
+            )
+            self.assertEqual(resp.status_code, 200)
+
+
+if __name__ == "__main__":
+    unittest.main()
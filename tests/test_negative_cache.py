@@ -0,0 +1,66 @@
+import time
+import unittest
+
+from mojang import API, NegativeCache
+
+from config import INVALID_USERNAME, NOTCH_USERNAME, NOTCH_UUID
+from fakes import fake_session
+
+
+class TestNegativeCache(unittest.TestCase):
+    """Tests the negative lookup cache for usernames that do not exist"""
+
+    def test_false_positive_rate(self):
+        cache = NegativeCache(capacity=10_000, false_positive_rate=0.01)
+        for i in range(10_000):
+            cache.add(f"missing{i}")
+
+        self.assertIn("MISSING42", cache)
+        false_positives = sum(f"player{i}" in cache for i in range(10_000))
+        self.assertLess(false_positives, 200)
+
+    def test_rotation(self):
+        cache = NegativeCache(window=0.05)
+        cache.add(INVALID_USERNAME)
+        time.sleep(0.06)
+        # Still remembered by the previous window
+        self.assertIn(INVALID_USERNAME, cache)
+        time.sleep(0.06)
+        self.assertNotIn(INVALID_USERNAME, cache)
+
+    def test_idle_for_several_windows(self):
+        cache = NegativeCache(window=0.05)
+        cache.add(INVALID_USERNAME)
+        # Nothing touches the cache for several windows, which must not leave the name in the previous one
+        time.sleep(0.2)
+        self.assertNotIn(INVALID_USERNAME, cache)
+
+    def test_short_circuit(self):
+        session = fake_session(
+            {
+                ("GET", f"https://api.mojang.com/users/profiles/minecraft/{NOTCH_USERNAME}"): (
+                    200,
+                    {"id": NOTCH_UUID, "name": NOTCH_USERNAME},
+                ),
+                ("GET", "https://api.mojang.com/users/profiles/minecraft/"): (204, b""),
+                ("POST", "https://api.mojang.com/profiles/minecraft"): (
+                    200,
+                    [{"id": NOTCH_UUID, "name": NOTCH_USERNAME}],
+                ),
+            }
+        )
+        api = API(session=session, negative_cache=NegativeCache())
+
+        self.assertIsNone(api.get_uuid(INVALID_USERNAME))
+        self.assertIsNone(api.get_uuid(INVALID_USERNAME))
+        self.assertEqual(len(session.adapter.calls), 1)
+
+        self.assertEqual(api.get_uuid(NOTCH_USERNAME), NOTCH_UUID)
+        self.assertEqual(api.get_uuids([NOTCH_USERNAME, "Nobody123"]), {NOTCH_USERNAME: NOTCH_UUID})
+        self.assertEqual(api.get_uuids(["nobody123", INVALID_USERNAME]), {})
+        self.assertEqual(len(session.adapter.calls), 3)
+        self.assertEqual(api.metrics.snapshot()["negative_cache_hits"], 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+import pickle
+import time
+import unittest
+
+from mojang import API, Hedging, NegativeCache, RequestScheduler
+from mojang._bulk import _map_processes
+
+from config import NOTCH_UUID
+from fakes import fake_session
+from test_http_client import _profile_body
+
+
+def _slow_profile(request):
+    time.sleep(0.5)
+    return 200, _profile_body()
+
+
+class TestPickle(unittest.TestCase):
+    """Tests copying clients to other processes"""
+
+    def test_round_trip(self):
+        cache = NegativeCache(capacity=100)
+        cache.add("nobody")
+        api = API(
+            scheduler=RequestScheduler(rate=5),
+            negative_cache=cache,
+            hedging=Hedging(percentile=90),
+            max_concurrency=4,
+            timeout=5,
+        )
+        api.metrics.increment("negative_cache_hits")
+
+        copy = pickle.loads(pickle.dumps(api))
+
+        self.assertIsNot(copy.session, api.session)
+        self.assertEqual(copy.session.headers["User-Agent"], api.session.headers["User-Agent"])
+        self.assertEqual(copy.timeout, 5)
+        self.assertEqual(copy.concurrency.max_limit, 4)
+        self.assertEqual(copy.scheduler.rate, 5)
+        self.assertEqual(copy.hedging.percentile, 90)
+        self.assertIn("nobody", copy.negative_cache)
+        self.assertEqual(copy.metrics.snapshot()["negative_cache_hits"], 1)
+
+    def test_after_fork(self):
+        api = API(scheduler=RequestScheduler(rate=5))
+        adapter = api.session.get_adapter("https://api.mojang.com")
+        pool_manager = adapter.poolmanager
+        # Locks held by threads at the time of the fork are never released in the child
+        api.metrics._lock.acquire()
+
+        api._after_fork()
+
+        self.assertIsNot(adapter.poolmanager, pool_manager)
+        api.metrics.increment("requests")
+        self.assertLess(api.scheduler.acquire("api.mojang.com"), 0.05)
+
+    def test_iter_profiles_processes(self):
+        session = fake_session(
+            {("GET", "https://sessionserver.mojang.com/"): (200, _profile_body())}
+        )
+        api = API(session=session)
+
+        profiles = list(api.iter_profiles([NOTCH_UUID] * 600, processes=2))
+
+        self.assertEqual(len(profiles), 600)
+        self.assertEqual(profiles[0].id, NOTCH_UUID)
+
+    def test_processes_time_budget(self):
+        session = fake_session({("GET", "https://sessionserver.mojang.com/"): _slow_profile})
+        api = API(session=session, max_concurrency=1)
+        start = time.monotonic()
+
+        profiles = list(
+            _map_processes(api, "iter_profiles", [NOTCH_UUID] * 20, 1, 2, time_budget=1.2)
+        )
+
+        self.assertLess(time.monotonic() - start, 1.6)
+        self.assertLess(len(profiles), 20)
+
+
+if __name__ == "__main__":
+    unittest.main()
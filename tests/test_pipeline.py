@@ -0,0 +1,72 @@
+import json
+import time
+import unittest
+
+from mojang import API
+
+from fakes import fake_session
+from test_http_client import _profile_body
+
+
+class TestResolveProfiles(unittest.TestCase):
+    """Tests the pipelined conversion of names to profiles"""
+
+    def setUp(self):
+        def lookup(request):
+            names = json.loads(request.body)
+            if "invalid!" in names:
+                return 400, {"errorMessage": "Invalid username"}
+            if "slow" in names:
+                time.sleep(0.5)
+            return 200, [
+                {"name": name, "id": f"{i:032x}"}
+                for i, name in enumerate(names)
+                if name != "nobody"
+            ]
+
+        def profile(request):
+            uuid = request.url.rsplit("/", 1)[-1]
+            return 200, _profile_body(uuid=uuid, name="Player")
+
+        self.api = API(
+            session=fake_session(
+                {
+                    ("POST", "https://api.mojang.com/profiles/minecraft"): lookup,
+                    ("GET", "https://sessionserver.mojang.com/"): profile,
+                }
+            )
+        )
+
+    def test_resolve_profiles(self):
+        names = [f"player{i}" for i in range(24)] + ["nobody"]
+
+        profiles = list(self.api.resolve_profiles(names))
+
+        self.assertEqual(len(profiles), 24)
+        self.assertEqual(self.api.concurrency.in_flight, 0)
+
+    def test_stages_overlap(self):
+        # The second batch is slow, the profiles of the first batch must not wait for it
+        names = [f"player{i}" for i in range(10)] + ["slow"] + ["other"] * 9
+        start = time.monotonic()
+
+        first = next(self.api.resolve_profiles(names))
+
+        self.assertLess(time.monotonic() - start, 0.4)
+        self.assertEqual(first.name, "Player")
+
+    def test_failed_items_are_skipped(self):
+        # The whole second chunk is rejected, the other chunks still complete
+        names = [f"player{i}" for i in range(10)] + ["invalid!"] + [f"other{i}" for i in range(9)]
+        names += [f"last{i}" for i in range(10)]
+
+        uuids = dict(self.api.iter_uuids(names))
+        profiles = list(self.api.resolve_profiles(names))
+
+        self.assertEqual(len(uuids), 20)
+        self.assertEqual(len(profiles), 20)
+        self.assertEqual(self.api.metrics.snapshot()["failed_items"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
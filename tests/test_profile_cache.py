@@ -0,0 +1,81 @@
+import json
+import unittest
+
+from mojang import Client, MojangError
+
+from fakes import fake_session
+from test_auth import OLD_TOKEN, _routes
+
+
+class TestProfileCache(unittest.TestCase):
+    """Tests that the cached profile follows the client's own changes"""
+
+    def setUp(self):
+        self.skin_url = "http://textures.minecraft.net/texture/old"
+
+        def profile(request):
+            return 200, {
+                "id": "abc",
+                "name": "Test",
+                "skins": [
+                    {
+                        "id": "1",
+                        "state": "ACTIVE",
+                        "url": self.skin_url,
+                        "variant": "CLASSIC",
+                    }
+                ],
+                "capes": [],
+            }
+
+        def change_skin(request):
+            self.skin_url = json.loads(request.body)["url"]
+            return profile(request)
+
+        routes = _routes(accepted=(OLD_TOKEN,))
+        routes = {
+            ("POST", "https://api.minecraftservices.com/minecraft/profile/skins"): change_skin,
+            ("DELETE", "https://api.minecraftservices.com/minecraft/profile/capes"): (500, ""),
+            **routes,
+            ("GET", "https://api.minecraftservices.com/minecraft/profile"): profile,
+        }
+        self.session = fake_session(routes)
+        self.client = Client(
+            bearer_token=OLD_TOKEN, session=self.session, cache_profile=True
+        )
+
+    def _profile_fetches(self):
+        return [
+            c
+            for c in self.session.adapter.calls
+            if c.method == "GET" and c.url.endswith("/minecraft/profile")
+        ]
+
+    def test_reads_are_cached(self):
+        # The profile fetched while validating the session is reused
+        fetches = len(self._profile_fetches())
+        self.assertEqual(self.client.get_profile().name, "Test")
+        self.assertEqual(self.client.get_profile().name, "Test")
+        self.assertEqual(len(self._profile_fetches()), fetches)
+
+    def test_update_on_change(self):
+        self.client.get_profile()
+        new_url = "http://textures.minecraft.net/texture/new"
+        self.client.change_skin(url=new_url)
+        fetches = len(self._profile_fetches())
+
+        self.assertEqual(self.client.get_profile().skins[0].url, new_url)
+        self.assertEqual(len(self._profile_fetches()), fetches)
+
+    def test_invalidate_on_failed_change(self):
+        self.client.get_profile()
+        with self.assertRaises(MojangError):
+            self.client.disable_cape()
+        fetches = len(self._profile_fetches())
+
+        self.client.get_profile()
+        self.assertEqual(len(self._profile_fetches()), fetches + 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+from mojang import (
+    API,
+    DeadlineExceeded,
+    RequestScheduler,
+    SQLiteRateLimitBackend,
+    TooManyRequests,
+)
+from mojang._scheduler import _current_priority
+
+from fakes import fake_session
+
+
+class TestRequestScheduler(unittest.TestCase):
+    """Tests the priority request scheduler"""
+
+    def test_reserved_share(self):
+        scheduler = RequestScheduler(rate=1, burst=2, interactive_share=0.5)
+
+        self.assertLess(scheduler.acquire("host", "bulk"), 0.05)
+        # The last token is reserved for interactive requests
+        self.assertGreater(scheduler.backend.try_take("host", 1, 2, 1), 0.9)
+        self.assertLess(scheduler.acquire("host", "interactive"), 0.05)
+
+    def test_interactive_preempts_bulk(self):
+        scheduler = RequestScheduler(rate=10, burst=1)
+        scheduler.acquire("host")
+        order = []
+
+        def acquire(priority):
+            scheduler.acquire("host", priority)
+            order.append(priority)
+
+        bulk = threading.Thread(target=acquire, args=("bulk",))
+        bulk.start()
+        time.sleep(0.01)
+        interactive = threading.Thread(target=acquire, args=("interactive",))
+        interactive.start()
+        bulk.join()
+        interactive.join()
+
+        self.assertEqual(order, ["interactive", "bulk"])
+
+    def test_priority_context(self):
+        api = API(scheduler=RequestScheduler(rate=1))
+
+        self.assertEqual(_current_priority.get(), "interactive")
+        with api.priority("bulk"):
+            self.assertEqual(_current_priority.get(), "bulk")
+        self.assertEqual(_current_priority.get(), "interactive")
+
+        with self.assertRaises(ValueError):
+            with api.priority("urgent"):
+                pass
+
+
+class TestSQLiteRateLimitBackend(unittest.TestCase):
+    """Tests the rate limit budget shared through a SQLite file"""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "ratelimit.db")
+
+    def _backend(self):
+        backend = SQLiteRateLimitBackend(self.path)
+        self.addCleanup(backend.close)
+        return backend
+
+    def test_shared_budget(self):
+        # Each backend has its own connection, like separate worker processes would
+        first, second = self._backend(), self._backend()
+
+        self.assertEqual(first.try_take("host", 1, 2, 0), 0)
+        self.assertEqual(second.try_take("host", 1, 2, 0), 0)
+        self.assertGreater(first.try_take("host", 1, 2, 0), 0.9)
+        self.assertEqual(second.try_take("other", 1, 2, 0), 0)
+
+    def test_backoff_is_shared(self):
+        session = fake_session({("GET", "https://api.mojang.com/"): (429, "")})
+        api = API(
+            session=session,
+            scheduler=RequestScheduler(rate=100, backend=self._backend()),
+            ratelimit_sleep_time=30,
+        )
+        with self.assertRaises(TooManyRequests):
+            api.get_uuid("Notch")
+
+        other = RequestScheduler(rate=100, backend=self._backend())
+        with self.assertRaises(DeadlineExceeded):
+            other.acquire("api.mojang.com", timeout=0.05)
+        self.assertGreater(other.backend.try_take("api.mojang.com", 100, 100, 0), 29)
+
+
+if __name__ == "__main__":
+    unittest.main()
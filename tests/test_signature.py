@@ -0,0 +1,109 @@
+import base64
+import hashlib
+import json
+import unittest
+
+from mojang import API
+from mojang._signature import _expected_message, _parse_public_key, _verify
+
+from fakes import fake_session
+from test_http_client import _profile_body
+
+# A 1024-bit test key, with a signature of "dGVzdA==" made by `openssl dgst -sha1 -sign`
+PUBLIC_KEY = (
+    "MIGfMA0GCSqGSIb3DQEBAQUAA4GNADCBiQKBgQDFpVaA/s7R2P4RxRpsNWN3+M1XNWZ0a1UTTP89//pNrmyDfI0YSi/Emz9MmOe9"
+    "VuTk2uaGOZFrJVPULdGnKWhHqtzrtfEMM+2Kyh/uNfRHEtfto2q1ZVosuPq9eVVOZ/VGhb0IXc0Thkrjsz4WW7Ws4eSh/9tZAnG7"
+    "MC0MRtQyfQIDAQAB"
+)
+PRIVATE_EXPONENT = int(
+    "b8c015bd5cf25d2c564aac1147e71c04d058b9d55be125579044202f8771255e0f67556cdab0b63834da95b234a5436d"
+    "9113a1fb04230fa203db49bd3961b66be87173587010cbc4cc413963d709c5ec563496429d49441bcadd1327e700f702"
+    "663f0e88e4c4a87ff811b657927a7c8644baa25778391cca9d28b300bf5650c1",
+    16,
+)
+OPENSSL_SIGNATURE = (
+    "RNft2HHc0frvrilraQSmtp71T2YLipno2xjx5kA+xgIO8qDdtKZELfSwPQnA6t996nA6oDMwux9dNVdrIZAT4MZcJ/LBiIxf1Vgg"
+    "yD9V/eQp0pR6RRMPsJDNcFeEt5Uf21xad+M00viDL7edWNHKTkJttyFA1u9GyojJuTj6fL0="
+)
+
+
+def _sign(value):
+    key = _parse_public_key(base64.b64decode(PUBLIC_KEY))
+    message = int.from_bytes(_expected_message(value, key.size), "big")
+    signature = pow(message, PRIVATE_EXPONENT, key.modulus).to_bytes(key.size, "big")
+    return base64.b64encode(signature).decode()
+
+
+def _signed_body(uuid, name):
+    body = _profile_body(uuid=uuid, name=name)
+    prop = body["properties"][0]
+    prop["signature"] = _sign(prop["value"])
+    return body
+
+
+class TestSignatures(unittest.TestCase):
+    """Tests the local verification of signed profile properties"""
+
+    def setUp(self):
+        def profile(request):
+            uuid = request.url.split("?")[0].rsplit("/", 1)[-1]
+            if "unsigned=false" in request.url:
+                return 200, _signed_body(uuid, "Player")
+            return 200, _profile_body(uuid=uuid, name="Player")
+
+        self.api = API(
+            session=fake_session(
+                {
+                    ("GET", "https://sessionserver.mojang.com/"): profile,
+                    ("GET", "https://api.minecraftservices.com/publickeys"): (
+                        200,
+                        {"profilePropertyKeys": [{"publicKey": PUBLIC_KEY}]},
+                    ),
+                }
+            )
+        )
+        self.calls = self.api.session.adapter.calls
+
+    def test_openssl_signature(self):
+        key = _parse_public_key(base64.b64decode(PUBLIC_KEY))
+
+        self.assertEqual(key.exponent, 65537)
+        self.assertTrue(_verify([key], "dGVzdA==", OPENSSL_SIGNATURE))
+        self.assertFalse(_verify([key], "dGVzdB==", OPENSSL_SIGNATURE))
+        self.assertFalse(_verify([key], "dGVzdA==", "not base64"))
+
+    def test_verify_profile(self):
+        unsigned = self.api.get_profile("a" * 32)
+        signed = self.api.get_profile("a" * 32, signed=True)
+
+        self.assertIsNone(unsigned.textures_signature)
+        self.assertTrue(self.api.verify_profile(signed))
+        self.assertFalse(self.api.verify_profile(unsigned))
+
+        signed.name = "Impostor"
+        self.assertFalse(self.api.verify_profile(signed))
+
+    def test_verify_profiles(self):
+        profiles = [self.api.get_profile(f"{i:032x}", signed=True) for i in range(3)]
+        forged = self.api.get_profile("f" * 32, signed=True)
+        data = json.loads(base64.b64decode(forged.textures_value))
+        data["textures"]["CAPE"] = {"url": "https://example.com/cape.png"}
+        forged.textures_value = base64.b64encode(json.dumps(data).encode()).decode()
+
+        results = self.api.verify_profiles(profiles + [forged] + profiles)
+
+        self.assertEqual(results, [True, True, True, False, True, True, True])
+        # The keys are fetched once and cached
+        self.api.verify_profile(profiles[0])
+        key_requests = [call for call in self.calls if call.url.endswith("/publickeys")]
+        self.assertEqual(len(key_requests), 1)
+
+    def test_signature_digest(self):
+        message = _expected_message("value", 128)
+
+        self.assertEqual(len(message), 128)
+        self.assertTrue(message.endswith(hashlib.sha1(b"value").digest()))
+
+
+if __name__ == "__main__":
+    unittest.main()
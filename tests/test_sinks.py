@@ -0,0 +1,117 @@
+import csv
+import json
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from mojang import API, PlayerUUID
+from mojang._types import UserProfile
+from mojang.sinks import CSVSink, NDJSONSink, ParquetSink, SQLiteSink
+
+from config import NOTCH_UUID, NOTCH_USERNAME
+from fakes import fake_session
+from test_http_client import _profile_body
+
+
+class TestSinks(unittest.TestCase):
+    """Tests streaming bulk results into the output sinks"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.records = [
+            {"name": f"player{i}", "id": PlayerUUID(f"{i:032x}")} for i in range(25)
+        ]
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.tmp.name, name)
+
+    def test_ndjson(self):
+        with NDJSONSink(self.path("out.ndjson"), batch_size=10, fsync="batch") as sink:
+            sink.write_many(self.records[:15])
+            # Only full batches have been written so far
+            with open(self.path("out.ndjson")) as f:
+                self.assertEqual(len(f.readlines()), 10)
+            sink.write_many(self.records[15:])
+
+        with open(self.path("out.ndjson")) as f:
+            rows = [json.loads(line) for line in f]
+        self.assertEqual(len(rows), 25)
+        self.assertEqual(rows[1]["id"], f"{1:032x}")
+
+    def test_csv_tuples(self):
+        with CSVSink(self.path("out.csv"), fields=("name", "id")) as sink:
+            sink.write_many([("Notch", NOTCH_UUID), ("jeb_", "853c80ef3c3749fdaa49938b674adae6")])
+
+        with open(self.path("out.csv")) as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual(rows[0], {"name": "Notch", "id": NOTCH_UUID})
+        with CSVSink(self.path("bad.csv")) as sink:
+            self.assertRaises(TypeError, sink.write, ("Notch",))
+
+    def test_sqlite_upsert(self):
+        with SQLiteSink(self.path("out.db"), batch_size=7) as sink:
+            sink.write_many(self.records)
+            sink.write({"name": "renamed", "id": self.records[0]["id"]})
+
+        connection = sqlite3.connect(self.path("out.db"))
+        self.assertEqual(connection.execute("SELECT COUNT(*) FROM results").fetchone()[0], 25)
+        name = connection.execute(
+            "SELECT name FROM results WHERE id = ?", (str(self.records[0]["id"]),)
+        ).fetchone()[0]
+        self.assertEqual(name, "renamed")
+        # The WAL used while the sink was open is checkpointed and removed on close
+        self.assertEqual(connection.execute("PRAGMA journal_mode").fetchone()[0], "delete")
+        self.assertFalse(os.path.exists(self.path("out.db-wal")))
+        connection.close()
+
+    def test_parquet(self):
+        try:
+            import pyarrow.parquet
+        except ImportError:
+            self.skipTest("pyarrow is not installed")
+
+        with ParquetSink(self.path("out.parquet"), batch_size=10) as sink:
+            sink.write_many(self.records)
+
+        table = pyarrow.parquet.read_table(self.path("out.parquet"))
+        self.assertEqual(table.num_rows, 25)
+        self.assertEqual(table.column("name")[3].as_py(), "player3")
+
+    def test_parquet_null_column(self):
+        try:
+            import pyarrow.parquet
+        except ImportError:
+            self.skipTest("pyarrow is not installed")
+
+        profiles = [
+            UserProfile(f"{i:032x}", 0, f"player{i}", False, "classic") for i in range(3)
+        ]
+        profiles[2].cape_url = "https://textures.minecraft.net/texture/cape"
+
+        # cape_url is empty in the whole first batch
+        with ParquetSink(self.path("out.parquet"), batch_size=2) as sink:
+            sink.write_many(profiles)
+
+        table = pyarrow.parquet.read_table(self.path("out.parquet"))
+        self.assertEqual(table.column("cape_url").to_pylist(), [None, None, profiles[2].cape_url])
+
+    def test_stream_profiles(self):
+        session = fake_session(
+            {("GET", "https://sessionserver.mojang.com/"): (200, _profile_body())}
+        )
+        api = API(session=session)
+
+        with NDJSONSink(self.path("profiles.ndjson")) as sink:
+            written = sink.write_many(api.iter_profiles([NOTCH_UUID] * 3))
+
+        self.assertEqual(written, 3)
+        with open(self.path("profiles.ndjson")) as f:
+            self.assertEqual(json.loads(f.readline())["name"], NOTCH_USERNAME)
+
+
+if __name__ == "__main__":
+    unittest.main()
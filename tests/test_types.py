@@ -0,0 +1,71 @@
+import pickle
+import sys
+import unittest
+import uuid
+
+from mojang import API, PlayerUUID
+from mojang._utils import _normalize_uuid
+
+from config import NOTCH_UUID, NOTCH_USERNAME, INVALID_UUID
+from fakes import fake_session
+
+
+NOTCH_DASHED_UUID = "069a79f4-44e9-4726-a5be-fca90e38aaf5"
+
+
+class TestPlayerUUID(unittest.TestCase):
+    """Tests the packed UUID type"""
+
+    def test_normalization(self):
+        packed = PlayerUUID(NOTCH_UUID)
+        self.assertEqual(packed, PlayerUUID(NOTCH_DASHED_UUID))
+        self.assertEqual(packed, PlayerUUID(NOTCH_UUID.upper()))
+        self.assertEqual(packed, PlayerUUID(uuid.UUID(NOTCH_UUID)))
+        self.assertEqual(packed, PlayerUUID(packed.bytes))
+        self.assertEqual(len(packed.bytes), 16)
+        self.assertEqual(str(packed), NOTCH_UUID)
+        self.assertEqual(packed.dashed, NOTCH_DASHED_UUID)
+
+    def test_dictionary_key(self):
+        results = {PlayerUUID(NOTCH_DASHED_UUID): "Notch"}
+        self.assertEqual(results[PlayerUUID(NOTCH_UUID)], "Notch")
+        self.assertEqual(pickle.loads(pickle.dumps(PlayerUUID(NOTCH_UUID))), PlayerUUID(NOTCH_UUID))
+        self.assertLess(PlayerUUID("0" * 32), PlayerUUID(NOTCH_UUID))
+
+    def test_invalid(self):
+        self.assertRaises(ValueError, PlayerUUID, INVALID_UUID)
+        self.assertRaises(ValueError, PlayerUUID, "z" * 32)
+        # bytes.fromhex skips whitespace, which must not shorten the UUID
+        self.assertRaises(ValueError, PlayerUUID, "069a79f4 44e94726a5befca90e38aa ")
+        self.assertRaises(ValueError, PlayerUUID, b"short")
+        self.assertRaises(AttributeError, setattr, PlayerUUID(NOTCH_UUID), "_bytes", b"")
+
+    def test_compact(self):
+        packed = PlayerUUID(NOTCH_UUID)
+        self.assertFalse(hasattr(packed, "__dict__"))
+        self.assertLess(sys.getsizeof(packed), sys.getsizeof(NOTCH_UUID))
+
+    def test_iter_uuids(self):
+        session = fake_session(
+            {
+                ("POST", "https://api.mojang.com/"): (
+                    200,
+                    [{"id": NOTCH_UUID, "name": NOTCH_USERNAME}],
+                )
+            }
+        )
+
+        results = dict(API(session=session).iter_uuids([NOTCH_USERNAME]))
+
+        self.assertEqual(results, {NOTCH_USERNAME: PlayerUUID(NOTCH_UUID)})
+        self.assertIsInstance(results[NOTCH_USERNAME], PlayerUUID)
+
+    def test_normalize_uuid(self):
+        self.assertEqual(_normalize_uuid(NOTCH_DASHED_UUID), NOTCH_UUID)
+        self.assertEqual(_normalize_uuid(PlayerUUID(NOTCH_UUID)), NOTCH_UUID)
+        # Invalid UUIDs are left for Mojang's servers to reject
+        self.assertEqual(_normalize_uuid(INVALID_UUID), INVALID_UUID)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+import unittest
+
+from mojang import API, PlayerUUID
+from mojang import validation
+
+from config import NOTCH_UUID
+from fakes import fake_session
+from test_http_client import _profile_body
+
+NOTCH_DASHED = "069a79f4-44e9-4726-a5be-fca90e38aaf5"
+
+USERNAMES = ["Notch", " jeb_ ", "NOTCH", "ab", "x" * 17, "bad name", "héllo", "a\0b", None]
+UUIDS = [NOTCH_DASHED, NOTCH_UUID.upper(), PlayerUUID(NOTCH_UUID), "z" * 32, NOTCH_DASHED[:-1], 42]
+
+
+class TestValidation(unittest.TestCase):
+    """Tests batch validation with both the pure-Python and the NumPy implementation"""
+
+    def test_usernames(self):
+        result = validation.validate_usernames(USERNAMES)
+
+        self.assertEqual(result.accepted, ["Notch", "jeb_"])
+        self.assertEqual(result.duplicates, 1)
+        self.assertEqual(
+            result.rejected,
+            [
+                (None, "type"),
+                ("ab", "length"),
+                ("x" * 17, "length"),
+                ("bad name", "characters"),
+                ("héllo", "characters"),
+                ("a\0b", "characters"),
+            ],
+        )
+
+    def test_uuids(self):
+        result = validation.validate_uuids(UUIDS)
+
+        self.assertEqual(result.accepted, [NOTCH_UUID])
+        self.assertEqual(result.duplicates, 2)
+        self.assertEqual(
+            [reason for _, reason in result.rejected], ["type", "format", "format"]
+        )
+
+    @unittest.skipIf(validation.np is None, "numpy is not installed")
+    def test_numpy_matches_python(self):
+        names = [name.strip() for name in USERNAMES if name is not None] * 20
+        uuids = [str(uuid) for uuid in UUIDS if uuid != 42] * 20
+
+        for dedupe in (True, False):
+            self.assertEqual(
+                validation._usernames_numpy(names, dedupe),
+                validation._usernames_python(names, dedupe),
+            )
+            self.assertEqual(
+                validation._uuids_numpy(uuids, dedupe),
+                validation._uuids_python(uuids, dedupe),
+            )
+
+    def test_iter_profiles_validate(self):
+        session = fake_session(
+            {("GET", "https://sessionserver.mojang.com/"): (200, _profile_body())}
+        )
+        api = API(session=session)
+
+        profiles = list(api.iter_profiles(UUIDS, validate=True))
+
+        self.assertEqual(len(profiles), 1)
+        self.assertEqual(len(session.adapter.calls), 1)
+        self.assertEqual(api.metrics.snapshot()["rejected_inputs"], 3)
+
+
+if __name__ == "__main__":
+    unittest.main()